@@ -0,0 +1,374 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import main
+
+"""
+makes fake field/pit scouting csvs and times every part of main.py on them, so we can
+tell if something got slower without waiting for an actual event
+"""
+
+FIELD_HEADER = [
+    "Timestamp",
+    "Name",
+    "Team Number",
+    "Match Number",
+    "Leave Community?",
+    "Auto Cone High",
+    "Auto Cone Mid",
+    "Auto Cone Low",
+    "Auto Cube High",
+    "Auto Cube Mid",
+    "Auto Cube Low",
+    "Auto Balance?",
+    "Tele Cone High",
+    "Tele Cone Mid",
+    "Tele Cone Low",
+    "Tele Cube High",
+    "Tele Cube Mid",
+    "Tele Cube Low",
+    "Tele Balance?",
+    "Defense?",
+    "Auto",
+    "Speed",
+    "Pick Up",
+    "Placement",
+    "Driver",
+    "Balanced",
+    "Pick?",
+    "How did it break?",
+    "Comments",
+]
+
+PIT_HEADER = [
+    "Timestamp",
+    "Name",
+    "Team Number",
+    "Weight",
+    "Speed",
+    "Drivetrain",
+    "Intake Method",
+    "Leave Community?",
+    "Picture 1",
+    "Picture 2",
+    "Picture 3",
+    "Picture 4",
+    "Picture 5",
+    "Picture 6",
+    "Picture 7",
+    "Starting Position",
+    "Scoring Capabilities",
+    "Scoring Method",
+    "Other Information",
+]
+
+COMMENTS = [
+    "good auto, fast cycles",
+    "missed a couple cones on high",
+    'kept dropping cubes, "wobbly" arm',
+    "played defense most of the match",
+    "",
+    "tipped over at the end\nbut got back up",
+]
+
+BREAKS = ["", "", "", "brownout", "arm stopped moving", "lost comms for 10s"]
+
+# (auto, tele) average number of pieces scored in each spot by an average team
+AVERAGE_PIECES = {"high": (0.4, 1.5), "mid": (0.3, 1.8), "low": (0.3, 1.5)}
+
+
+def checkbox_cell(count):
+    # the form is a checkbox list, so n pieces shows up as "1, 2, ..., n"
+    if count == 0:
+        return "0"
+    return ", ".join(str(i) for i in range(1, count + 1))
+
+
+def choose(rng, options, p):
+    return options[rng.choice(len(options), p=p)]
+
+
+def generate_teams(rng, num_teams):
+    teams = rng.choice(np.arange(100, 9500), size=num_teams - 1, replace=False)
+    return sorted(teams.tolist() + [1787])
+
+
+def generate_field_csv(path, num_teams, num_matches, num_days=2, num_scouts=12, seed=0):
+    rng = np.random.default_rng(seed)
+    teams = generate_teams(rng, num_teams)
+    skill = dict(zip(teams, rng.lognormal(0, 0.4, size=num_teams)))
+    scouts = [f"scout{i}" for i in range(num_scouts)]
+
+    rows = []
+    schedule = []
+    for match in range(1, num_matches + 1):
+        # deal everyone out evenly, like a real qualification schedule
+        if len(schedule) < 6:
+            schedule += rng.permutation(teams).tolist()
+        alliance, schedule = schedule[:6], schedule[6:]
+
+        day = (match - 1) * num_days // num_matches
+        minutes = 8 * 60 + ((match - 1) % max(num_matches // num_days, 1)) * 7
+        timestamp = f"3/{3 + day}/2023 {minutes // 60}:{minutes % 60:02d}:00"
+
+        for team in alliance:
+            team_skill = skill[team]
+            grid = []
+            for period in [0, 1]:
+                for _ in ["cone", "cube"]:
+                    for level in ["high", "mid", "low"]:
+                        count = rng.poisson(AVERAGE_PIECES[level][period] * team_skill)
+                        grid.append(checkbox_cell(min(count, 9)))
+
+            balance = ["Yes, balanced", "Yes, unbalanced", "No"]
+            engaged = min(0.25 * team_skill, 0.9)
+            balance_p = [engaged, (1 - engaged) / 2, (1 - engaged) / 2]
+            ranks = [
+                choose(rng, ["Good", "OK", "Bad"], [0.3, 0.5, 0.2]) for _ in range(7)
+            ]
+
+            rows.append(
+                [timestamp, rng.choice(scouts), team, match]
+                + [choose(rng, ["Yes", "No"], [0.8, 0.2])]
+                + grid[:6]
+                + [choose(rng, balance, balance_p)]
+                + grid[6:]
+                + [choose(rng, balance, balance_p)]
+                + [choose(rng, ["No", "Yes", "Not sure"], [0.75, 0.15, 0.1])]
+                + ranks
+                + [rng.choice(BREAKS), rng.choice(COMMENTS)]
+            )
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELD_HEADER)
+        writer.writerows(rows)
+
+    return teams
+
+
+def generate_pit_csv(path, teams, seed=0):
+    rng = np.random.default_rng(seed)
+    intakes = ["Ground", "Single Substation", "Double Substation"]
+    pieces = ["Cone", "Cube"]
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(PIT_HEADER)
+        for team in teams:
+            writer.writerow(
+                ["3/2/2023 18:00:00", "pit scout", team]
+                + [int(rng.integers(80, 125)), int(rng.integers(10, 18))]
+                + [rng.choice(["Swerve", "Tank", "Mecanum"])]
+                + [" ".join(rng.choice(intakes, size=2, replace=False))]
+                + [rng.choice(["Yes", "No"])]
+                + [""] * 7
+                + [rng.choice(["Left", "Middle", "Right"])]
+                + [
+                    " ".join(
+                        rng.choice(pieces, size=int(rng.integers(1, 3)), replace=False)
+                    )
+                ]
+                + [rng.choice(["Arm", "Elevator", "Shooter"]), ""]
+            )
+
+
+def time_it(function, repeats):
+    # best of a few runs, since the first one is usually the noisiest
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        # hides all the "Processing team" lines
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return round(best, 4), result
+
+
+def benchmark_scale(num_teams, num_matches, num_days, num_scouts, repeats):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        field_path = os.path.join(tmp_dir, "field_scouting.csv")
+        pit_path = os.path.join(tmp_dir, "pit_scouting.csv")
+        all_teams = generate_field_csv(
+            field_path, num_teams, num_matches, num_days, num_scouts
+        )
+        generate_pit_csv(pit_path, all_teams)
+
+        # create_spreadsheet writes output.xlsx wherever we are
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)
+        try:
+            stages = {}
+            raw_df = main.read_field_csv(field_path)
+            stages["create_categories"], _ = time_it(
+                lambda: main.create_categories(raw_df.copy()), repeats
+            )
+            stages["get_team_dfs"], (teams, df) = time_it(
+                lambda: main.get_team_dfs(field_path, 0), repeats
+            )
+            stages["get_rankings"], _ = time_it(
+                lambda: main.get_rankings(df, teams), repeats
+            )
+            # what a plain run of main.py actually does, with the confidence intervals
+            stages["get_rankings_bootstrap"], (rankings, stats_df) = time_it(
+                lambda: main.get_rankings(
+                    df, teams, resamples=main.BOOTSTRAP_RESAMPLES
+                ),
+                repeats,
+            )
+            stages["get_pit_info"], pit_df = time_it(
+                lambda: main.get_pit_info(pit_path, teams), repeats
+            )
+            stages["create_spreadsheet"], _ = time_it(
+                lambda: main.create_spreadsheet(teams, df, stats_df, rankings, pit_df),
+                repeats,
+            )
+            output_size = os.path.getsize("output.xlsx")
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "teams": num_teams,
+        "matches": num_matches,
+        "days": num_days,
+        "scouts": num_scouts,
+        "rows": len(df),
+        "output_bytes": output_size,
+        "stages": stages,
+    }
+
+
+def compare(results, baseline, threshold):
+    # returns the stages that got more than threshold slower than the baseline
+    regressions = []
+    old_scales = {(s["teams"], s["matches"]): s for s in baseline["scales"]}
+    for scale in results["scales"]:
+        old = old_scales.get((scale["teams"], scale["matches"]))
+        if old is None:
+            continue
+        for stage, seconds in scale["stages"].items():
+            old_seconds = old["stages"].get(stage)
+            if old_seconds is None or old_seconds == 0:
+                continue
+            change = (seconds - old_seconds) / old_seconds
+            print(
+                f"{scale['teams']:>4} teams {scale['matches']:>4} matches  "
+                f"{stage:<24} {old_seconds:>8.4f}s -> {seconds:>8.4f}s ({change:+.0%})"
+            )
+            if change > threshold:
+                regressions.append((scale["teams"], scale["matches"], stage, change))
+
+    return regressions
+
+
+def process_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the scouting program on fake events"
+    )
+
+    parser.add_argument(
+        "--scales",
+        type=str,
+        nargs="+",
+        help="event sizes to run, as teams:matches (e.g. 40:80 60:120).",
+        default=["30:60", "60:120", "120:400"],
+    )
+    parser.add_argument("--days", type=int, help="days per event.", default=2)
+    parser.add_argument("--scouts", type=int, help="number of scouts.", default=12)
+    parser.add_argument(
+        "--repeats", type=int, help="runs per stage (keeps the best).", default=3
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        help="baseline json to compare against / save to.",
+        default="benchmarks/baseline.json",
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="save the results as the new baseline instead of comparing.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="how much slower (0.2 = 20%%) a stage can get before it counts as a regression.",
+        default=0.2,
+    )
+    parser.add_argument(
+        "--generate",
+        type=str,
+        help="just write field_scouting.csv and pit_scouting.csv for the first scale into this folder.",
+        default="",
+    )
+
+    return parser.parse_args()
+
+
+def main_benchmark():
+    args = process_args()
+    scales = [tuple(map(int, scale.split(":"))) for scale in args.scales]
+
+    if args.generate != "":
+        os.makedirs(args.generate, exist_ok=True)
+        num_teams, num_matches = scales[0]
+        teams = generate_field_csv(
+            os.path.join(args.generate, "field_scouting.csv"),
+            num_teams,
+            num_matches,
+            args.days,
+            args.scouts,
+        )
+        generate_pit_csv(os.path.join(args.generate, "pit_scouting.csv"), teams)
+        return
+
+    results = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "scales": [],
+    }
+    for num_teams, num_matches in scales:
+        print(f"Benchmarking {num_teams} teams, {num_matches} matches...")
+        scale = benchmark_scale(
+            num_teams, num_matches, args.days, args.scouts, args.repeats
+        )
+        for stage, seconds in scale["stages"].items():
+            print(f"    {stage:<24} {seconds:.4f}s")
+        results["scales"].append(scale)
+
+    if args.save or not os.path.exists(args.baseline):
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.threshold)
+    for num_teams, num_matches, stage, change in regressions:
+        print(
+            f"REGRESSION: {stage} is {change:.0%} slower at {num_teams} teams, {num_matches} matches"
+        )
+    if len(regressions) != 0:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main_benchmark()
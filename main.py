@@ -1,7 +1,27 @@
 import argparse
-from scipy import stats
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import contextlib
+import cProfile
+import functools
+import glob
+import hashlib
+import html
+import io
+import json
+import os
+import posixpath
+import re
+import sqlite3
+import time
+import tracemalloc
+from xml.etree import ElementTree
+import zipfile
+from scipy import sparse, stats
+from scipy.sparse.linalg import cg
 import pandas as pd
 import xlsxwriter
+from xlsxwriter.utility import xl_col_to_name
 from colour import Color
 import numpy as np
 
@@ -11,188 +31,1554 @@ to anyone trying to read this code in future seasons, i am very sorry, honestly
 i'm not commenting this either because i'm lazy and there's no point in commenting 700 lines of stupidity
 """
 
+# bump this whenever create_categories or get_info change what they output,
+# otherwise old cached field data will keep getting loaded
+SCORING_VERSION = 6
+
+# same idea for --update: bump it whenever write_team_sheet changes what a team sheet
+# looks like, otherwise sheets written by the old code will never get rewritten
+SHEET_VERSION = 2
+
+# namespaces of the xml in an xlsx, for finding which parts belong to which sheet
+XLSX_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+XLSX_RELS_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+
+# gets filled in while --profile is on, stays None otherwise
+PROFILE = None
+
+
+def start_profile(cprofile=False):
+    global PROFILE
+    PROFILE = {
+        "stages": [],
+        "teams": {},
+        "stack": [],
+        "entered": 0,
+        "cprofile": cprofile,
+    }
+    tracemalloc.start()
+
+
+def profile_stage(name, team=None):
+    # a no-op unless --profile is on, so it's fine to leave these everywhere
+    if PROFILE is None:
+        return contextlib.nullcontext()
+    return record_stage(name, team)
+
+
+@contextlib.contextmanager
+def record_stage(name, team):
+    stack = PROFILE["stack"]
+    # resetting the peak would lose whatever the outer stage hit so far, so save it
+    if len(stack) != 0:
+        stack[-1]["peak"] = max(stack[-1]["peak"], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+
+    PROFILE["entered"] += 1
+    record = {
+        "name": name,
+        "order": PROFILE["entered"],
+        "depth": len(stack),
+        "start_memory": tracemalloc.get_traced_memory()[0],
+        "peak": 0,
+    }
+    # cProfile can't nest, so only the top level stages get one
+    profile = None
+    if PROFILE["cprofile"] and len(stack) == 0:
+        profile = cProfile.Profile()
+        profile.enable()
+
+    stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        if profile is not None:
+            profile.disable()
+            record["profile"] = profile
+
+        stack.pop()
+        record["peak"] = max(record["peak"], tracemalloc.get_traced_memory()[1])
+        if len(stack) != 0:
+            stack[-1]["peak"] = max(stack[-1]["peak"], record["peak"])
+
+        if team is None:
+            PROFILE["stages"].append(record)
+        else:
+            PROFILE["teams"][team] = record["seconds"]
+
+
+def get_profile_trace():
+    # depth first order, so the summary reads top to bottom
+    stages = sorted(PROFILE["stages"], key=lambda record: record["order"])
+    return {
+        "stages": [
+            {
+                "name": record["name"],
+                "depth": record["depth"],
+                "seconds": round(record["seconds"], 6),
+                "peak_mb": round(record["peak"] / 2**20, 3),
+                "added_mb": round((record["peak"] - record["start_memory"]) / 2**20, 3),
+            }
+            for record in stages
+        ],
+        "teams": {
+            str(team): round(seconds, 6) for team, seconds in PROFILE["teams"].items()
+        },
+    }
 
-def get_info(df):
-    # oops this is very bad code
-    aggregate_columns = [
-        "total_points",
-        "tele_points",
-        "auto_points",
-        "num_cycles",
-        "charge_station_points",
-        "high_points",
-        "mid_points",
-        "low_points",
-        "high_cycles",
-        "mid_cycles",
-        "low_cycles",
-        "cone_points",
-        "cube_points",
-        # "qualitative_sum",
-        "overall_rank",
-    ]
-    ret_df = pd.DataFrame(
-        np.zeros((len(df), len(aggregate_columns))), columns=aggregate_columns
-    )
 
-    for name in df.columns:
-        if "cone" not in name and "cube" not in name:
-            continue
+def print_profile(trace):
+    total = sum(stage["seconds"] for stage in trace["stages"] if stage["depth"] == 0)
+
+    print()
+    print(f"{'stage':<30} {'seconds':>9} {'%':>7} {'peak MB':>9} {'added MB':>9}")
+    for stage in trace["stages"]:
+        name = "  " * stage["depth"] + stage["name"]
+        print(
+            f"{name:<30} {stage['seconds']:>9.4f} {stage['seconds'] * 100 / total:>6.1f}%"
+            f" {stage['peak_mb']:>9.2f} {stage['added_mb']:>9.2f}"
+        )
+    print(f"{'total':<30} {total:>9.4f}")
+
+    teams = trace["teams"]
+    if len(teams) != 0:
+        slowest = sorted(teams.items(), key=lambda item: item[1], reverse=True)
+        print()
+        print(
+            f"team sheets: {len(teams)} teams, "
+            f"{sum(teams.values()) / len(teams):.4f}s average, slowest:"
+        )
+        for team, seconds in slowest[:5]:
+            print(f"  {team:<8} {seconds:.4f}s")
+
+
+def finish_profile(json_path="", cprofile_path=""):
+    global PROFILE
+    tracemalloc.stop()
+
+    trace = get_profile_trace()
+    print_profile(trace)
+
+    if json_path != "":
+        with open(json_path, "w") as f:
+            json.dump(trace, f, indent=2)
+
+    if cprofile_path != "":
+        top_stages = [record for record in PROFILE["stages"] if "profile" in record]
+        hottest = max(top_stages, key=lambda record: record["seconds"])
+        hottest["profile"].dump_stats(cprofile_path)
+        print(f"\ncProfile of {hottest['name']} saved to {cprofile_path}")
+
+    PROFILE = None
+
+
+# how many points every scoring column is worth for each metric. next season's game
+# should (hopefully) just need this table changed instead of get_info
+SCORING_TABLE = {
+    "auto_cone_high": {"total_points": 6, "auto_points": 6},
+    "auto_cone_mid": {"total_points": 4, "auto_points": 4},
+    "auto_cone_low": {"total_points": 3, "auto_points": 3},
+    "auto_cube_high": {"total_points": 6, "auto_points": 6},
+    "auto_cube_mid": {"total_points": 4, "auto_points": 4},
+    "auto_cube_low": {"total_points": 3, "auto_points": 3},
+    "tele_cone_high": {
+        "total_points": 5,
+        "tele_points": 5,
+        "high_points": 5,
+        "cone_points": 5,
+        "num_cycles": 1,
+        "high_cycles": 1,
+    },
+    "tele_cone_mid": {
+        "total_points": 3,
+        "tele_points": 3,
+        "mid_points": 3,
+        "cone_points": 3,
+        "num_cycles": 1,
+        "mid_cycles": 1,
+    },
+    "tele_cone_low": {
+        "total_points": 2,
+        "tele_points": 2,
+        "low_points": 2,
+        "cone_points": 2,
+        "num_cycles": 1,
+        "low_cycles": 1,
+    },
+    "tele_cube_high": {
+        "total_points": 5,
+        "tele_points": 5,
+        "high_points": 5,
+        "cube_points": 5,
+        "num_cycles": 1,
+        "high_cycles": 1,
+    },
+    "tele_cube_mid": {
+        "total_points": 3,
+        "tele_points": 3,
+        "mid_points": 3,
+        "cube_points": 3,
+        "num_cycles": 1,
+        "mid_cycles": 1,
+    },
+    "tele_cube_low": {
+        "total_points": 2,
+        "tele_points": 2,
+        "low_points": 2,
+        "cube_points": 2,
+        "num_cycles": 1,
+        "low_cycles": 1,
+    },
+    # these already got turned into points in create_categories / get_info
+    "leave_community": {"total_points": 1, "auto_points": 1},
+    "auto_balance": {"total_points": 1, "auto_points": 1},
+    "tele_balance": {"total_points": 1, "charge_station_points": 1},
+}
+
+SCORING_METRICS = [
+    "total_points",
+    "tele_points",
+    "auto_points",
+    "num_cycles",
+    "charge_station_points",
+    "high_points",
+    "mid_points",
+    "low_points",
+    "high_cycles",
+    "mid_cycles",
+    "low_cycles",
+    "cone_points",
+    "cube_points",
+]
+
+
+def get_scoring_matrix():
+    # scoring columns x metrics, so scoring every match is one matrix multiply
+    weights = np.zeros((len(SCORING_TABLE), len(SCORING_METRICS)))
+    for i, column_weights in enumerate(SCORING_TABLE.values()):
+        for metric, weight in column_weights.items():
+            weights[i, SCORING_METRICS.index(metric)] = weight
+
+    return weights
+
+
+SCORING_MATRIX = get_scoring_matrix()
+
+# stats column -> the field data column it's the average of
+AVERAGE_COLUMNS = {
+    "average_total_points": "total_points",
+    "average_auto_points": "auto_points",
+    "average_num_cycles": "num_cycles",
+    "average_charge_station_points": "charge_station_points",
+    "average_teleop_points": "tele_points",
+}
+
+# metrics that get a team rating from get_ratings, and the stats column it goes in
+RATING_METRICS = {
+    "total_points": "points_rating",
+    "auto_points": "auto_rating",
+    "num_cycles": "cycles_rating",
+}
+
+# how hard each kind of rating gets pulled towards the average, about how many
+# average matches worth of data it takes to move halfway. scouts and matches get
+# pulled harder so the teams soak up most of the difference
+RATING_PENALTIES = {"team": 1.0, "scout": 5.0, "match": 5.0}
+
+FIELD_COLUMNS = [
+    "timestamp",
+    "name",
+    "team_number",
+    "match_number",
+    "leave_community",
+    "auto_cone_high",
+    "auto_cone_mid",
+    "auto_cone_low",
+    "auto_cube_high",
+    "auto_cube_mid",
+    "auto_cube_low",
+    "auto_balance",
+    "tele_cone_high",
+    "tele_cone_mid",
+    "tele_cone_low",
+    "tele_cube_high",
+    "tele_cube_mid",
+    "tele_cube_low",
+    "tele_balance",
+    "defense",
+    "rank_auto",
+    "rank_speed",
+    "rank_pick_up",
+    "rank_placement",
+    "rank_driver",
+    "rank_balanced",
+    "rank_pick",
+    "how_break",
+    "comments",
+]
+
+GRID_COLUMNS = [
+    f"{period}_{piece}_{level}"
+    for period in ["auto", "tele"]
+    for piece in ["cone", "cube"]
+    for level in ["high", "mid", "low"]
+]
+
+# what create_categories turns every multiple choice answer into
+LEAVE_COMMUNITY_POINTS = {"Yes": 3, "No": 0}
+AUTO_BALANCE_POINTS = {"Yes, balanced": 12, "Yes, unbalanced": 8, "No": 0}
+TELE_BALANCE_POINTS = {"Yes, balanced": 10, "Yes, unbalanced": 6, "No": 0}
+RANK_SCORES = {"Good": 3, "OK": 2, "Bad": 1}
+
+# what every field data column gets stored as once create_categories is done with it.
+# the small ints fall back to float64 if a column has blanks, since the averages need
+# nan to skip them. comments are a category too: the frame only keeps a small code per
+# row and every different comment gets stored once, off to the side
+FIELD_SCHEMA = {
+    "timestamp": "int8",
+    "name": "category",
+    "team_number": "int32",
+    "match_number": "int16",
+    "leave_community": "int8",
+    **{column: "int8" for column in GRID_COLUMNS},
+    "auto_balance": "int8",
+    "tele_balance": "int8",
+    "defense": "category",
+    "rank_auto": "int8",
+    "rank_speed": "int8",
+    "rank_pick_up": "int8",
+    "rank_placement": "int8",
+    "rank_driver": "int8",
+    "rank_balanced": "int8",
+    "rank_pick": "int8",
+    "how_break": "category",
+    "comments": "category",
+    "overall_rank": "int8",
+    "event": "category",
+    # everything get_info scores, which is always whole points/cycles
+    **{column: "int16" for column in SCORING_METRICS},
+}
+
+
+# match table on every team's sheet: field data column -> what it's called on the sheet
+TEAM_DATA_COLUMNS = {
+    "match_number": "Match #",
+    "total_points": "Total Points",
+    "tele_points": "Teleop Points",
+    "auto_points": "Auto Points",
+    "num_cycles": "# of Cycles",
+    "charge_station_points": "Endgame Balance",
+    # "high_points": "High Points",
+    # "mid_points": "Mid Points",
+    # "low_points": "Low Points",
+    # "cone_points": "Cone Points",
+    # "cube_points": "Cube Points",
+    "overall_rank": "Combined Score",
+    "rank_auto": "Auto Score",
+    "rank_speed": "Speed Score",
+    "rank_pick_up": "Pickup Score",
+    "rank_placement": "Placement Score",
+    "rank_driver": "Driver Score",
+    "rank_balanced": "Balanced Score",
+    "rank_pick": "Pick? Score",
+}
+
+# the rest of what goes on a team sheet: scouts' written answers, which rankings
+# get shown and the stats under them
+TEAM_WRITTEN_COLUMNS = {
+    "name": "Name",
+    "comments": "Comments",
+    "how_break": "How break?",
+}
+TEAM_RANKED_COLUMNS = [
+    "Total Points",
+    "Auto Points",
+    "# of Cycles",
+    "Endgame Balance",
+    "Qualitative Sum",
+]
+TEAM_STATS_COLUMNS = {
+    "lsrl_slope": "LSRL Slope",
+    "defense_percentage": "Defense %",
+    "p_value": "P-value",
+}
 
-        column = df[name]
-        score = 0
-        if "auto" in name:
-            score += 1
-
-        if "high" in name:
-            score += 5
-            if "tele" in name:
-                ret_df["high_points"] += score * column
-                ret_df["high_cycles"] += column
-            if "auto" in name:
-                ret_df["auto_points"] += score * column
-        if "mid" in name:
-            score += 3
-            if "tele" in name:
-                ret_df["mid_points"] += score * column
-                ret_df["mid_cycles"] += column
-            if "auto" in name:
-                ret_df["auto_points"] += score * column
-        if "low" in name:
-            score += 2
-            if "tele" in name:
-                ret_df["low_points"] += score * column
-                ret_df["low_cycles"] += column
-            if "auto" in name:
-                ret_df["auto_points"] += score * column
-
-        if "cone" in name and "tele" in name:
-            ret_df["cone_points"] += score * column
-
-        if "cube" in name and "tele" in name:
-            ret_df["cube_points"] += score * column
-
-        ret_df["total_points"] += score * column
-        if "tele" in name:
-            ret_df["num_cycles"] += column
-
-    df["leave_community"] = df["leave_community"].replace({"Yes": 3, "No": 0})
-    ret_df["total_points"] += (
-        df["leave_community"] + df["auto_balance"] + df["tele_balance"]
-    )
-    ret_df["auto_points"] += df["leave_community"] + df["auto_balance"]
-    ret_df["tele_points"] = (
-        ret_df["high_cycles"] * 5 + ret_df["mid_cycles"] * 3 + ret_df["low_cycles"] * 2
-    )
-    ret_df["charge_station_points"] += df["tele_balance"]
 
+def get_info(df):
+    ret_df = get_scores(df)
     ret_df["overall_rank"] = df.filter(regex="rank").sum(axis=1)
 
     return ret_df
 
 
-def create_categories(df):
+def get_scores(df):
+    # a question nobody answered doesn't score anything
+    scoring = np.nan_to_num(df[list(SCORING_TABLE)].to_numpy(dtype=float), copy=False)
+    return pd.DataFrame(scoring @ SCORING_MATRIX, columns=SCORING_METRICS)
+
+
+def parse_checkbox_cells(cells, reduce="max"):
+    # parses every cell at once by treating them as one big byte string, instead of
+    # calling int() on every number. each run of digits is one checked number
+    # str() also covers nan/None, which have no digits so they come out empty
+    buf = np.frombuffer("\n".join(map(str, cells)).encode(), dtype=np.uint8)
+    newlines = np.flatnonzero(buf == ord("\n"))
+
+    digit_pos = np.flatnonzero((buf >= ord("0")) & (buf <= ord("9")))
+    starts = np.ones(len(digit_pos), dtype=bool)
+    starts[1:] = np.diff(digit_pos) != 1
+    token = np.cumsum(starts) - 1
+
+    # every digit is worth 10 ** (how many digits come after it in its number)
+    ends = np.flatnonzero(np.append(starts[1:], True))
+    place = ends[token] - np.arange(len(digit_pos))
+    digits = buf[digit_pos].astype(np.int64) - ord("0")
+    powers = 10 ** np.arange(19, dtype=np.int64)
+    values = np.bincount(token, weights=digits * powers[place]).astype(np.int64)
+
+    token_cells = np.searchsorted(newlines, digit_pos[starts])
+    counts = np.bincount(token_cells, minlength=len(cells))
+
+    if reduce == "count":
+        return counts
+    if reduce == "sum":
+        return np.bincount(token_cells, weights=values, minlength=len(cells)).astype(
+            np.int64
+        )
+    if reduce == "max":
+        ret = np.zeros(len(cells), dtype=np.int64)
+        checked = counts > 0
+        if checked.any():
+            first_token = np.cumsum(counts) - counts
+            ret[checked] = np.maximum.reduceat(values, first_token[checked])
+        return ret
+
+    raise ValueError(f"reduce should be max, count or sum, not {reduce}")
+
+
+def parse_checkbox_columns(df, columns, reduce="max"):
+    # "a, b, c" checkbox cells -> max, count or sum of the numbers checked
+    # empty cells (nan or "") always come out as 0
+    ret = {}
+    text_columns = []
+
+    for column in columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            # read_field_csv reads these as categoricals, so just parse the categories
+            values = np.append(
+                parse_checkbox_cells(df[column].cat.categories, reduce), 0
+            )
+            ret[column] = values[df[column].cat.codes]
+        elif not pd.api.types.is_numeric_dtype(df[column]):
+            text_columns.append(column)
+        elif reduce == "count":
+            ret[column] = df[column].notna().astype(np.int64)
+        else:
+            # read_csv already made it a number (every cell had one box checked)
+            ret[column] = df[column].fillna(0).astype(np.int64)
+
+    if len(text_columns) != 0:
+        cells = df[text_columns].to_numpy().ravel(order="F")
+        # there's only so many combinations of boxes, so only parse each one once
+        codes, uniques = pd.factorize(cells)
+        # nan gets code -1, which picks up the 0 on the end
+        values = np.append(parse_checkbox_cells(uniques, reduce), 0)[codes]
+        values = values.reshape((len(df), len(text_columns)), order="F")
+        for i, column in enumerate(text_columns):
+            ret[column] = values[:, i]
+
+    return pd.DataFrame(ret, index=df.index, columns=columns)
+
+
+def get_dates(df):
+    # just the date part of every timestamp. there's only a few different dates, so only
+    # those get parsed (nan ends up as NaT)
+    codes, dates = pd.factorize(df["timestamp"].str.split(" ", n=1).str[0])
+    dates = np.append(pd.to_datetime(dates).to_numpy(), np.datetime64("NaT"))
+    return pd.Series(dates[codes], index=df.index)
+
+
+def get_event_days(dates):
+    # every date that shows up, in order
+    return np.unique(dates.to_numpy())
+
+
+def create_categories(df, days=None):
     # we should also have top points, mid points, low points, cube points, cone points,
-    df["timestamp"] = df["timestamp"].apply(lambda x: x.split(" ")[0])
-
-    # very, very inefficient code...
-    dates = df["timestamp"]
-    dates = dates.sort_values()
-    if dates.iloc[0] != dates.iloc[-1]:
-        dates = dates.replace(dates.iloc[0], 1)
-        dates = dates.replace(dates.iloc[-1], 2)
-    else:
-        dates = dates.replace(dates.iloc[0], 1)
+    dates = get_dates(df)
 
-    df["timestamp"] = dates
+    # watch mode passes in the days from the whole csv, not just the new rows
+    if days is None:
+        days = get_event_days(dates)
+    # day 1, 2, 3... for however many days there are (practice day included)
+    df["timestamp"] = np.searchsorted(days, dates.to_numpy()) + 1
 
     df[["team_number", "match_number"]] = df[["team_number", "match_number"]].astype(
         int
     )
 
-    grid_columns = [
-        "auto_cone_high",
-        "auto_cone_mid",
-        "auto_cone_low",
-        "auto_cube_high",
-        "auto_cube_mid",
-        "auto_cube_low",
-        "tele_cone_high",
-        "tele_cone_mid",
-        "tele_cone_low",
-        "tele_cube_high",
-        "tele_cube_mid",
-        "tele_cube_low",
-    ]
+    df[GRID_COLUMNS] = parse_checkbox_columns(df, GRID_COLUMNS)
+
+    df["leave_community"] = df["leave_community"].replace(LEAVE_COMMUNITY_POINTS)
+    df["auto_balance"] = df["auto_balance"].replace(AUTO_BALANCE_POINTS)
+    df["tele_balance"] = df["tele_balance"].replace(TELE_BALANCE_POINTS)
+    rank_columns = [column for column in df.columns if column.startswith("rank_")]
+    df[rank_columns] = df[rank_columns].replace(RANK_SCORES)
+    df = apply_field_schema(df)
+
+    # one column at a time instead of join, which would copy everything else too
+    info = get_info(df)
+    for column in info.columns:
+        df[column] = info[column].to_numpy()
+
+    df = apply_field_schema(df)
+    # the date of every day number, so a season can line its events' days up by date.
+    # a tuple, since pandas compares attrs when frames get concatenated
+    df.attrs["days"] = tuple(days)
+    return df
+
+
+def get_read_dtypes():
+    # the columns that repeat the same few strings get read straight into categoricals,
+    # so there's never a full copy of them as python strings
+    return {
+        column: "category"
+        for column, dtype in FIELD_SCHEMA.items()
+        if column in FIELD_COLUMNS
+        and column != "timestamp"
+        and dtype in ["category", "int8"]
+    }
+
+
+def read_field_csv(field_path, header="infer"):
+    df = pd.read_csv(
+        field_path,
+        header=0 if header == "infer" else header,
+        names=FIELD_COLUMNS,
+        dtype=get_read_dtypes(),
+    )
+    df.replace("", "Empty field")
+
+    return df
+
+
+def apply_field_schema(df):
+    for column, dtype in FIELD_SCHEMA.items():
+        if column not in df or df[column].dtype == dtype:
+            continue
+        if dtype not in ["category", "object"] and df[column].isna().any():
+            dtype = "float64"
+        df[column] = df[column].astype(dtype)
+
+    return df
+
+
+FIELD_DB_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+CHECKBOX_PATTERN = re.compile(r"\d+(\s*,\s*\d+)*")
 
-    df[grid_columns] = df[grid_columns].astype(str)
-    df[grid_columns] = df[grid_columns].applymap(lambda x: max(map(int, x.split(", "))))
-    df[grid_columns] = df[grid_columns].astype(int)
 
-    df["auto_balance"] = df["auto_balance"].replace(
-        {"Yes, balanced": 12, "Yes, unbalanced": 8, "No": 0}
+def is_field_db(path):
+    return str(path).endswith(FIELD_DB_EXTENSIONS)
+
+
+def connect_field_db(db_path):
+    conn = sqlite3.connect(
+        os.path.expanduser(db_path), timeout=30, check_same_thread=False
     )
-    df["tele_balance"] = df["tele_balance"].replace(
-        {"Yes, balanced": 10, "Yes, unbalanced": 6, "No": 0}
+    # wal lets everything else keep reading while scouts are submitting, and normal
+    # sync is still safe in wal mode (a power cut can only lose the last commits)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    columns = ", ".join(
+        (
+            f"{column} INTEGER NOT NULL"
+            if column in ["team_number", "match_number"]
+            else f"{column} TEXT"
+        )
+        for column in FIELD_COLUMNS
     )
-    df = df.replace({"Good": 3, "OK": 2, "Bad": 1})
+    with conn:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS field_rows (id INTEGER PRIMARY KEY, {columns})"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS field_rows_team ON field_rows (team_number)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS field_rows_match ON field_rows (match_number)"
+        )
+
+    return conn
+
+
+def query_field_db(db_path, after_id=0, limit=-1):
+    # rows in the order they got submitted, like the csv, and their ids
+    with contextlib.closing(connect_field_db(db_path)) as conn:
+        df = pd.read_sql_query(
+            f"SELECT id, {', '.join(FIELD_COLUMNS)} FROM field_rows"
+            " WHERE id > ? ORDER BY id LIMIT ?",
+            conn,
+            params=(after_id, limit),
+        )
+
+    ids = df.pop("id").to_numpy()
+    # None -> nan, same as an empty csv cell
+    return df.fillna(np.nan), ids
+
 
-    df = df.join(get_info(df))
+def read_field_db(db_path, after_id=0):
+    # same thing read_field_csv gives back, plus the last row id for watch mode
+    df, ids = query_field_db(db_path, after_id)
+    last_id = int(ids[-1]) if len(ids) != 0 else after_id
+    return df.astype(get_read_dtypes()), last_id
+
+
+def get_field_version(field_path):
+    # changes whenever there's something new for watch mode to read. the db can't use
+    # the file's size or mtime since new rows sit in the wal file for a while
+    if is_field_db(field_path):
+        with contextlib.closing(connect_field_db(field_path)) as conn:
+            return conn.execute("SELECT count(*), max(id) FROM field_rows").fetchone()
+
+    stat = os.stat(field_path)
+    return stat.st_size, stat.st_mtime
+
+
+def validate_field_row(row):
+    # only lets in answers create_categories knows what to do with, so a typo from a
+    # scout's tablet can't break the next run. blanks are fine, like in the csv
+    if isinstance(row, dict):
+        unknown = sorted(set(row) - set(FIELD_COLUMNS))
+        if len(unknown) != 0:
+            raise ValueError(f"unknown fields {unknown}")
+        values = [row.get(column) for column in FIELD_COLUMNS]
+    elif isinstance(row, list) and len(row) == len(FIELD_COLUMNS):
+        values = row
+    else:
+        raise ValueError(
+            f"a row should be an object or a list of {len(FIELD_COLUMNS)} values"
+        )
+
+    row = {}
+    for column, value in zip(FIELD_COLUMNS, values):
+        if isinstance(value, bool) or not isinstance(value, (str, int, type(None))):
+            raise ValueError(f"{column} should be text or a whole number")
+        value = "" if value is None else str(value).strip()
+        row[column] = None if value == "" else value
+
+    if row["timestamp"] is None:
+        row["timestamp"] = time.strftime("%m/%d/%Y %H:%M:%S")
+    try:
+        pd.to_datetime(row["timestamp"].split(" ", 1)[0])
+    except (ValueError, OverflowError):
+        raise ValueError(f"timestamp {row['timestamp']!r} doesn't start with a date")
+
+    for column in ["team_number", "match_number"]:
+        if row[column] is None or not row[column].isdigit():
+            raise ValueError(f"{column} should be a whole number")
+        row[column] = int(row[column])
+
+    for column in GRID_COLUMNS:
+        if row[column] is not None and not CHECKBOX_PATTERN.fullmatch(row[column]):
+            raise ValueError(f"{column} should look like 0 or 1, 2, 3")
+
+    choices = {
+        "leave_community": LEAVE_COMMUNITY_POINTS,
+        "auto_balance": AUTO_BALANCE_POINTS,
+        "tele_balance": TELE_BALANCE_POINTS,
+        **{
+            column: RANK_SCORES
+            for column in FIELD_COLUMNS
+            if column.startswith("rank_")
+        },
+    }
+    for column, options in choices.items():
+        if row[column] is not None and row[column] not in options:
+            raise ValueError(f"{column} should be one of {list(options)}")
+
+    return tuple(row[column] for column in FIELD_COLUMNS)
+
+
+def insert_field_rows(conn, rows):
+    # one transaction for the whole batch, which is most of the cost of a commit
+    with conn:
+        placeholders = ", ".join("?" * len(FIELD_COLUMNS))
+        return [
+            conn.execute(
+                f"INSERT INTO field_rows ({', '.join(FIELD_COLUMNS)})"
+                f" VALUES ({placeholders})",
+                row,
+            ).lastrowid
+            for row in rows
+        ]
+
+
+# everything the sql backend needs from create_categories, saved next to every row
+SCORE_COLUMNS = (
+    ["team_number", "match_number", "auto_balance", "tele_balance"]
+    + [column for column in FIELD_COLUMNS if column.startswith("rank_")]
+    + ["overall_rank"]
+    + list(AVERAGE_COLUMNS.values())
+)
+
+# the points come out of SCORING_MATRIX as floats in the dataframe version
+SCORE_DTYPES = {column: float for column in AVERAGE_COLUMNS.values()}
+
+
+def score_field_db(db_path, chunk_size=10_000):
+    # runs create_categories on the rows that haven't been scored yet (all of them if
+    # SCORING_VERSION changed) a chunk at a time, and saves the numbers in field_scores
+    with contextlib.closing(connect_field_db(db_path)) as conn:
+        columns = ", ".join(f"{column} INTEGER" for column in SCORE_COLUMNS)
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS field_scores"
+                f" (id INTEGER PRIMARY KEY, day TEXT, {columns})"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS field_scores_team"
+                " ON field_scores (team_number, id)"
+            )
+            # the scores plus the answers that never needed scoring
+            conn.execute(
+                "CREATE VIEW IF NOT EXISTS scored_rows AS SELECT field_scores.*,"
+                " name, defense, how_break, comments"
+                " FROM field_scores JOIN field_rows USING (id)"
+            )
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCORING_VERSION:
+                conn.execute("DELETE FROM field_scores")
+                conn.execute(f"PRAGMA user_version = {SCORING_VERSION}")
+
+        last_id = conn.execute("SELECT max(id) FROM field_scores").fetchone()[0] or 0
+        while True:
+            df, ids = query_field_db(db_path, last_id, chunk_size)
+            if len(df) == 0:
+                return
+
+            # the actual dates, since the day numbers depend on every row
+            dates = get_dates(df).dt.strftime("%Y-%m-%d")
+            df = create_categories(df.astype(get_read_dtypes()))
+            values = [ids.tolist(), dates.tolist()] + [
+                df[column].tolist() for column in SCORE_COLUMNS
+            ]
+            rows = [
+                [None if value != value else value for value in row]
+                for row in zip(*values)
+            ]
+            placeholders = ", ".join("?" * (len(SCORE_COLUMNS) + 2))
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO field_scores VALUES ({placeholders})", rows
+                )
+            last_id = int(ids[-1])
+
+
+def get_db_days(conn):
+    # day 1, 2, 3... like create_categories, from the dates that show up
+    days = conn.execute(
+        "SELECT DISTINCT day FROM field_scores WHERE day IS NOT NULL ORDER BY day"
+    ).fetchall()
+    return {day: i + 1 for i, (day,) in enumerate(days)}
+
+
+def get_db_team_sums(conn, days):
+    # get_team_sums as one group by, so only a row per team comes back
+    day_columns = []
+    for day, number in days.items():
+        day_columns += [
+            f"total(day = '{day}') AS day{number}_count",
+            f"total(CASE WHEN day = '{day}' THEN total_points END) AS day{number}_sum",
+            f"total(CASE WHEN day = '{day}' THEN total_points * total_points END)"
+            f" AS day{number}_sq",
+        ]
+
+    return pd.read_sql_query(
+        f"""
+        SELECT
+            team_number,
+            count(*) AS count,
+            total(total_points) AS total_points,
+            total(x * total_points) AS xy,
+            total(defense = 'Yes') AS is_defense,
+            total(overall_rank) AS qualitative,
+            total(auto_points) AS auto_points,
+            total(num_cycles) AS num_cycles,
+            total(charge_station_points) AS charge_station_points,
+            total(tele_points) AS tele_points
+            {"".join(", " + column for column in day_columns)}
+        FROM (
+            SELECT
+                *,
+                row_number() OVER (PARTITION BY team_number ORDER BY id) - 1 AS x
+            FROM scored_rows
+        )
+        GROUP BY team_number
+        ORDER BY team_number
+        """,
+        conn,
+        index_col="team_number",
+    ).astype(float)
+
+
+def get_db_ratings(conn, solutions=None):
+    # same ridge regression as get_ratings. design.T @ design is just how many rows
+    # every pair of team/scout/match labels share, and design.T @ y is the metric's
+    # total for every label, so both come out of group bys
+    rows = "SELECT *, coalesce(name, '') AS scout FROM scored_rows"
+    totals = ", ".join(f"total({metric}) AS {metric}" for metric in RATING_METRICS)
+    groups = {}
+    for kind, column in [
+        ("team", "team_number"),
+        ("scout", "scout"),
+        ("match", "match_number"),
+    ]:
+        # in the order they first show up, like pd.factorize in get_rating_design
+        groups[kind] = pd.read_sql_query(
+            f"SELECT {column} AS label, count(*) AS count, {totals}"
+            f" FROM ({rows}) GROUP BY {column} ORDER BY min(id)",
+            conn,
+        )
+
+    starts = {}
+    labels = []
+    for kind, group in groups.items():
+        starts[kind] = len(labels)
+        labels += [(kind, label) for label in group["label"]]
+    codes = {
+        kind: pd.Series(np.arange(len(group)) + starts[kind], index=group["label"])
+        for kind, group in groups.items()
+    }
+
+    counts = np.concatenate([group["count"].to_numpy() for group in groups.values()])
+    penalties = get_rating_penalties(*[len(group) for group in groups.values()])
+    entries = [(np.arange(len(labels)), np.arange(len(labels)), counts + penalties)]
+    for (a, a_column), (b, b_column) in [
+        (("team", "team_number"), ("scout", "scout")),
+        (("team", "team_number"), ("match", "match_number")),
+        (("scout", "scout"), ("match", "match_number")),
+    ]:
+        pairs = pd.read_sql_query(
+            f"SELECT {a_column} AS a, {b_column} AS b, count(*) AS count"
+            f" FROM ({rows}) GROUP BY {a_column}, {b_column}",
+            conn,
+        )
+        i = codes[a][pairs["a"]].to_numpy()
+        j = codes[b][pairs["b"]].to_numpy()
+        entries += [(i, j, pairs["count"]), (j, i, pairs["count"])]
+
+    i, j, values = [np.concatenate(part) for part in zip(*entries)]
+    normal = sparse.coo_matrix(
+        (values.astype(float), (i, j)), shape=(len(labels), len(labels))
+    ).tocsr()
+
+    targets = {}
+    for metric in RATING_METRICS:
+        sums = np.concatenate([group[metric].to_numpy() for group in groups.values()])
+        mean = groups["team"][metric].sum() / groups["team"]["count"].sum()
+        targets[metric] = (mean, sums - mean * counts)
+
+    teams = pd.Index(groups["team"]["label"])
+    return solve_ratings(normal, targets, labels, teams, solutions)
+
+
+def read_db_scores(db_path, columns):
+    # just some of the scored numbers for every row, for the things that resample rows
+    with contextlib.closing(connect_field_db(db_path)) as conn:
+        return pd.read_sql_query(
+            f"SELECT {', '.join(columns)} FROM field_scores ORDER BY id", conn
+        )
+
+
+def get_db_rankings(db_path, min_points, resamples=0, by_lower_bound=False):
+    # get_team_dfs + get_rankings without ever loading the field data
+    with profile_stage("score_db"):
+        score_field_db(db_path)
+
+    with contextlib.closing(connect_field_db(db_path)) as conn:
+        with profile_stage("get_db_sums"):
+            sums = get_db_team_sums(conn, get_db_days(conn))
+        if len(sums) == 0:
+            raise ValueError(f"{db_path} doesn't have any field rows yet")
+        with profile_stage("get_db_ratings"):
+            ratings = get_db_ratings(conn)
+
+    averages = sums["total_points"] / sums["count"]
+    teams = averages.index[averages >= min_points].tolist()
+
+    df = None
+    if resamples > 0:
+        # the intervals resample every team's matches, so they need the numbers
+        # from every row (only the ones that get averaged)
+        rank_columns = [
+            column for column in SCORE_COLUMNS if column.startswith("rank_")
+        ]
+        df = read_db_scores(
+            db_path, ["team_number"] + list(AVERAGE_COLUMNS.values()) + rank_columns
+        )
+
+    rankings, stats_df = get_rankings(
+        df,
+        teams,
+        sums,
+        resamples=resamples,
+        by_lower_bound=by_lower_bound,
+        ratings=ratings,
+    )
+    return teams, rankings, stats_df
+
+
+def get_db_team_rows(db_path, team):
+    # one team's match table, straight off the team index
+    columns = list(TEAM_DATA_COLUMNS) + ["name", "comments", "how_break"]
+    with contextlib.closing(connect_field_db(db_path)) as conn:
+        return pd.read_sql_query(
+            f"SELECT {', '.join(columns)} FROM scored_rows"
+            " WHERE team_number = ? ORDER BY id",
+            conn,
+            params=(int(team),),
+        ).astype(SCORE_DTYPES)
+
+
+def get_db_team_views(db_path, teams, stats_df, rankings, pit_df):
+    # get_team_views with every per-team number done by group bys. the match rows
+    # only get fetched once a team's sheet is actually being written
+    data_columns = list(TEAM_DATA_COLUMNS)
+    with contextlib.closing(connect_field_db(db_path)) as conn:
+        averages = pd.read_sql_query(
+            f"SELECT team_number, {', '.join(f'avg({c}) AS {c}' for c in data_columns)}"
+            " FROM field_scores GROUP BY team_number",
+            conn,
+            index_col="team_number",
+        ).round(2)
+
+        def histogram(column, values):
+            counts = ", ".join(
+                f"count(CASE WHEN {column} = ? THEN 1 END) AS '{value}'"
+                for value in values
+            )
+            counts = pd.read_sql_query(
+                f"SELECT team_number, {counts} FROM scored_rows GROUP BY team_number",
+                conn,
+                params=values,
+                index_col="team_number",
+            )
+            counts.columns = values
+            return counts
+
+        days = get_db_days(conn)
+        day_means = pd.read_sql_query(
+            "SELECT team_number, day, avg(total_points) AS total_points"
+            " FROM field_scores GROUP BY team_number, day",
+            conn,
+        )
+        summaries = {
+            "averages": averages,
+            "auto_balance": histogram("auto_balance", [12, 8, 0]),
+            "tele_balance": histogram("tele_balance", [10, 6, 0]),
+            "defense": histogram("defense", ["Yes", "No", "Not sure"]),
+            "day_means": day_means.assign(day=day_means["day"].map(days))
+            .set_index(["team_number", "day"])["total_points"]
+            .unstack(),
+        }
+
+    return build_team_views(
+        teams,
+        lambda team: functools.partial(get_db_team_rows, db_path, team),
+        summaries,
+        stats_df,
+        rankings,
+        pit_df,
+    )
+
+
+def get_db_match_table(db_path, teams):
+    # get_match_table straight from the db
+    columns = (
+        ["team_number"] + list(TEAM_DATA_COLUMNS) + ["name", "comments", "how_break"]
+    )
+    with contextlib.closing(connect_field_db(db_path)) as conn:
+        return pd.read_sql_query(
+            f"SELECT {', '.join(columns)} FROM scored_rows"
+            f" WHERE team_number IN ({', '.join('?' * len(teams))})"
+            " ORDER BY team_number, id",
+            conn,
+            params=[int(team) for team in teams],
+        ).astype(SCORE_DTYPES)
+
+
+def print_memory_report(field_paths, df):
+    # how big the field data would be as plain read_csv output vs. what we keep
+    before = pd.Series(0, index=df.columns)
+    for path in field_paths:
+        if is_field_db(path):
+            raw = query_field_db(path)[0]
+        else:
+            raw = pd.read_csv(path, header=0, names=FIELD_COLUMNS)
+        before = before.add(raw.memory_usage(index=False, deep=True), fill_value=0)
+    after = df.memory_usage(index=False, deep=True)
+
+    print(f"{'column':<24}{'dtype':>10}{'before MB':>12}{'after MB':>12}")
+    for column in df.columns:
+        print(
+            f"{column:<24}{str(df[column].dtype):>10}"
+            f"{before[column] / 1e6:>12.3f}{after[column] / 1e6:>12.3f}"
+        )
+    print(f"{'total':<24}{'':>10}{before.sum() / 1e6:>12.3f}{after.sum() / 1e6:>12.3f}")
+
+
+def get_cache_path(data, cache_dir):
+    key = hashlib.sha256(data)
+    key.update(str(SCORING_VERSION).encode())
+    return os.path.join(cache_dir, f"field_{key.hexdigest()[:32]}.pkl")
+
+
+def clean_cache(cache_dir, max_files=20, max_age_days=14):
+    paths = glob.glob(os.path.join(cache_dir, "field_*.pkl"))
+    paths.sort(key=os.path.getmtime, reverse=True)
+    oldest = time.time() - max_age_days * 24 * 60 * 60
+
+    for i, path in enumerate(paths):
+        if i >= max_files or os.path.getmtime(path) < oldest:
+            os.remove(path)
+
+
+def load_field_df(field_path, cache_dir, clean=True):
+    if is_field_db(field_path):
+        # already parsed, so there's nothing worth caching
+        with profile_stage("read_db"):
+            df = read_field_db(field_path)[0]
+        with profile_stage("create_categories"):
+            return create_categories(df)
+
+    # caches the parsed + scored field data, keyed on the csv contents
+    with profile_stage("read_file"):
+        with open(os.path.expanduser(field_path), "rb") as f:
+            data = f.read()
+
+    if cache_dir != "":
+        cache_path = get_cache_path(data, cache_dir)
+        if os.path.exists(cache_path):
+            with profile_stage("load_cache"):
+                # touch it so it counts as recently used
+                os.utime(cache_path)
+                return pd.read_pickle(cache_path)
+
+    with profile_stage("read_csv"):
+        df = read_field_csv(io.BytesIO(data))
+    with profile_stage("create_categories"):
+        df = create_categories(df)
+
+    if cache_dir != "":
+        with profile_stage("save_cache"):
+            # pickle keeps the exact dtypes (and the days in attrs) without needing pyarrow
+            os.makedirs(cache_dir, exist_ok=True)
+            df.to_pickle(cache_path + ".tmp")
+            os.replace(cache_path + ".tmp", cache_path)
+            if clean:
+                clean_cache(cache_dir)
 
     return df
 
 
-def get_team_dfs(field_path, min_points):
-    columns = [
-        "timestamp",
-        "name",
-        "team_number",
-        "match_number",
-        "leave_community",
-        "auto_cone_high",
-        "auto_cone_mid",
-        "auto_cone_low",
-        "auto_cube_high",
-        "auto_cube_mid",
-        "auto_cube_low",
-        "auto_balance",
-        "tele_cone_high",
-        "tele_cone_mid",
-        "tele_cone_low",
-        "tele_cube_high",
-        "tele_cube_mid",
-        "tele_cube_low",
-        "tele_balance",
-        "defense",
-        "rank_auto",
-        "rank_speed",
-        "rank_pick_up",
-        "rank_placement",
-        "rank_driver",
-        "rank_balanced",
-        "rank_pick",
-        "how_break",
-        "comments",
-    ]
+def get_csv_paths(paths):
+    # any folders get swapped out for every csv in them
+    if isinstance(paths, str):
+        paths = [paths]
 
-    df = pd.read_csv(field_path)
-    df.columns = columns
-    df.replace("", "Empty field")
+    csv_paths = []
+    for path in paths:
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            csv_paths += sorted(glob.glob(os.path.join(path, "*.csv")))
+        else:
+            csv_paths.append(path)
+
+    return csv_paths
+
+
+def get_event_keys(paths):
+    # the csv name is the event key, e.g. 2023paca.csv -> 2023paca
+    keys = []
+    for path in paths:
+        key = os.path.splitext(os.path.basename(path))[0]
+        base, i = key, 2
+        while key in keys:
+            key = f"{base}_{i}"
+            i += 1
+        keys.append(key)
+
+    return keys
+
+
+def load_event_df(field_path, event, cache_dir):
+    df = load_field_df(field_path, cache_dir, clean=False)
+    df["event"] = event
+    return df
 
-    df = create_categories(df)
+
+def load_season_df(field_paths, cache_dir="", processes=None):
+    # every event gets parsed in its own process, so a season takes about as long as
+    # the biggest event instead of all of them added up
+    events = get_event_keys(field_paths)
+
+    if len(field_paths) == 1:
+        return load_event_df(field_paths[0], events[0], cache_dir)
+
+    with ProcessPoolExecutor(processes) as executor:
+        dfs = list(
+            executor.map(
+                load_event_df,
+                field_paths,
+                events,
+                [cache_dir] * len(field_paths),
+            )
+        )
+
+    if cache_dir != "":
+        # once, here, so the workers don't delete each other's files
+        clean_cache(cache_dir, max_files=max(20, len(field_paths)))
+
+    # events go in the order they happened and days get numbered by date across the
+    # whole season, so the lsrl runs in date order and the p-value/day means compare
+    # actual dates instead of "day 1 of every event" vs "day 2 of every event".
+    # match numbers still repeat across events
+    event_days = [np.array(df.attrs["days"], dtype="datetime64[ns]") for df in dfs]
+    days = np.unique(np.concatenate(event_days))
+    for df, dates in zip(dfs, event_days):
+        df["timestamp"] = np.searchsorted(days, dates[df["timestamp"] - 1]) + 1
+        df.attrs["days"] = tuple(days)
+    # (an empty csv has no days, so it gets NaT and goes last)
+    first_days = [np.append(dates, np.datetime64("NaT"))[0] for dates in event_days]
+    order = np.argsort(first_days, kind="stable")
+
+    return apply_field_schema(pd.concat([dfs[i] for i in order], ignore_index=True))
+
+
+def get_team_dfs(field_path, min_points, cache_dir="", processes=None):
+    df = load_season_df(get_csv_paths(field_path), cache_dir, processes)
+    return get_teams(df, min_points), df
+
+
+def get_teams(df, min_points):
     teams = df["team_number"].unique()
 
     teams.sort()
     ret = []
 
+    averages = df.groupby("team_number")["total_points"].mean()
     for team in teams:
-        if df.loc[df["team_number"] == team]["total_points"].mean() >= min_points:
+        if averages[team] >= min_points:
             ret.append(team)
 
-    return ret, df
+    return ret
+
+
+RECONCILE_POLICIES = ["none", "latest", "median", "trust"]
+
 
+def parse_scout_trust(items):
+    # ["alice=2", "bob=0.5"] -> {"alice": 2.0, "bob": 0.5}
+    trust = {}
+    for item in items or []:
+        name, _, weight = item.rpartition("=")
+        try:
+            trust[name] = float(weight)
+        except ValueError:
+            name = ""
+        if name == "" or not trust[name] >= 0:
+            raise ValueError(f"scout trust should look like name=2.5, not {item!r}")
 
-def get_rankings(df, teams):
+    return trust
+
+
+def reconcile_rows(df, policy="latest", trust=None):
+    # more than one row for the same robot in the same match (someone submitted twice,
+    # or two scouts watched it) would count double everywhere, so they get merged into
+    # one row by policy:
+    #   none: just report them
+    #   latest: keep the last row submitted
+    #   median: median of every answer, on the last row submitted
+    #   trust: average of every answer weighted by scout (trust, default 1)
+    # exact copies (same answers, whoever sent them) always just count once. everything
+    # is a hash group by, so this is linear in the number of rows
+    # returns the new field data and a table of what got merged
+    keys = [
+        column for column in ["event", "team_number", "match_number"] if column in df
+    ]
+    groups = df.groupby(keys, sort=False, observed=True).ngroup().to_numpy()
+    answers = [
+        column for column in FIELD_COLUMNS if column not in ["timestamp", "name"]
+    ]
+    hashes = pd.util.hash_pandas_object(df[answers], index=False).to_numpy()
+
+    # every copy but the last
+    duplicate = pd.DataFrame({"group": groups, "hash": hashes}).duplicated(keep="last")
+    duplicate = duplicate.to_numpy()
+    sizes = np.bincount(groups[~duplicate], minlength=groups.max(initial=-1) + 1)
+    merging = sizes[groups] > 1
+    flagged = np.zeros(len(sizes), dtype=bool)
+    flagged[groups[duplicate | merging]] = True
+    report = get_reconcile_report(df, groups, duplicate, flagged, keys)
+
+    if policy == "none" or not flagged.any():
+        report["Merged Total Points"] = np.NaN
+        return df, report.reset_index(drop=True)
+
+    df = df[~duplicate]
+    groups = groups[~duplicate]
+    merging = merging[~duplicate]
+    latest = ~pd.Series(groups).duplicated(keep="last").to_numpy()
+    merged = df[latest].reset_index(drop=True)
+
+    if policy != "latest":
+        answers = merge_answers(df[merging], groups[merging], policy, trust)
+        # the merged answers go on each group's latest row, which then gets rescored
+        targets = pd.Index(groups[latest]).get_indexer(answers.index)
+        for column in answers.columns:
+            dtype = object if column in ["defense", "comments"] else float
+            values = merged[column].to_numpy(dtype=dtype, copy=True)
+            values[targets] = answers[column].to_numpy()
+            merged[column] = values
+
+        scores = get_scores(merged.iloc[targets])
+        for column in SCORING_METRICS:
+            # merged scores can be fractions, which the int16 columns can't hold
+            values = merged[column].to_numpy(dtype=float, copy=True)
+            values[targets] = scores[column].to_numpy()
+            merged[column] = values
+        merged["overall_rank"] = merged.filter(regex="rank_").sum(axis=1)
+        merged["defense"] = merged["defense"].astype("category")
+
+    after = pd.Series(merged["total_points"].to_numpy(), index=groups[latest])
+    report["Merged Total Points"] = after.reindex(report.index).round(2).to_numpy()
+    return merged, report.reset_index(drop=True)
+
+
+def merge_answers(rows, groups, policy, trust=None):
+    # one row of answers per group: the median or trust weighted average of every
+    # scored answer, the defense answer with the most weight, and everyone's comments
+    weights = np.ones(len(rows))
+    if policy == "trust":
+        names = rows["name"].astype(object).map(trust or {})
+        weights = names.fillna(1.0).to_numpy(dtype=float)
+
+    inputs = list(SCORING_TABLE) + [
+        column for column in rows.columns if column.startswith("rank_")
+    ]
+    values = pd.DataFrame(rows[inputs].to_numpy(dtype=float), columns=inputs)
+    if policy == "median":
+        answers = values.groupby(groups).median()
+    else:
+        # blank answers don't count towards the weights either
+        answered = values.notna().mul(weights, axis=0).groupby(groups).sum()
+        answers = values.fillna(0).mul(weights, axis=0).groupby(groups).sum() / answered
+
+    votes = pd.DataFrame(
+        {
+            "group": groups,
+            "defense": rows["defense"].astype(object).to_numpy(),
+            "weight": weights,
+        }
+    )
+    votes = votes.groupby(["group", "defense"])["weight"].sum().reset_index()
+    votes = votes.sort_values("weight", ascending=False, kind="stable")
+    votes = votes.drop_duplicates("group").set_index("group")
+    answers["defense"] = votes["defense"]
+    answers["comments"] = join_groups(groups, rows["comments"], " | ")
+
+    return answers
+
+
+def get_reconcile_report(df, groups, duplicate, flagged, keys):
+    # one row for every team/match that had more than one row, indexed by group
+    in_report = flagged[groups]
+    rows = df[in_report]
+    rows_groups = groups[in_report]
+    first = ~pd.Series(rows_groups).duplicated().to_numpy()
+    report_groups = rows_groups[first]
+
+    report = rows.loc[first, keys].set_axis(report_groups)
+    report.columns = [
+        {"event": "Event", "team_number": "Team", "match_number": "Match"}[key]
+        for key in keys
+    ]
+    report["Rows"] = np.bincount(rows_groups)[report_groups]
+    duplicates = np.bincount(rows_groups, weights=duplicate[in_report])
+    report["Exact Duplicates"] = duplicates[report_groups].astype(int)
+    report["Scouts"] = join_groups(rows_groups, rows["name"], ", ")
+    report["Total Points"] = join_groups(
+        rows_groups, rows["total_points"].map("{:g}".format), " / ", unique=False
+    )
+    return report
+
+
+def join_groups(groups, values, sep, unique=True):
+    # every group's strings joined in order (blanks left out), without a python call
+    # per group: the strings get lined up by group and added up with reduceat
+    df = pd.DataFrame({"group": groups, "value": np.asarray(values, dtype=object)})
+    df = df.dropna()
+    if unique:
+        df = df.drop_duplicates()
+    order = np.argsort(df["group"].to_numpy(), kind="stable")
+    groups = df["group"].to_numpy()[order]
+    values = sep + df["value"].astype(str).to_numpy(dtype=object)[order]
+    if len(values) == 0:
+        return pd.Series([], dtype=object)
+
+    starts = np.flatnonzero(np.append(True, groups[1:] != groups[:-1]))
+    joined = np.add.reduceat(values, starts)
+    return pd.Series([value[len(sep) :] for value in joined], index=groups[starts])
+
+
+def print_reconcile_report(report, policy):
+    duplicates = report["Exact Duplicates"].sum()
+    merged = (report["Rows"] - report["Exact Duplicates"] > 1).sum()
+    if policy == "none":
+        print(
+            f"Found {duplicates} duplicate rows and {merged} team/matches with"
+            " different answers from more than one row (--reconcile to merge them)"
+        )
+    else:
+        print(
+            f"Dropped {duplicates} duplicate rows and merged {merged} team/matches"
+            f" with different answers ({policy})"
+        )
+
+
+def get_team_sums(df, start_counts=None):
+    # everything in one groupby pass instead of a dozen df.loc scans per team
+    points = df["total_points"].astype(float)
+
+    # x for the lsrl is just the order the team's rows show up in
+    x = df.groupby("team_number").cumcount().astype(float)
+    if start_counts is not None:
+        # watch mode: new rows pick up where the team's old rows left off
+        x += df["team_number"].map(start_counts).fillna(0)
+
+    grouped = pd.DataFrame(
+        {
+            "team_number": df["team_number"],
+            "count": 1.0,
+            "total_points": points,
+            "xy": x * points,
+            "is_defense": (df["defense"] == "Yes").astype(float),
+            "qualitative": df.filter(regex="rank_").sum(axis=1),
+        }
+    )
+
+    for column in [
+        "auto_points",
+        "num_cycles",
+        "charge_station_points",
+        "tele_points",
+    ]:
+        grouped[column] = df[column]
+
+    for day in np.unique(df["timestamp"]):
+        in_day = (df["timestamp"] == day).astype(float)
+        grouped[f"day{day}_count"] = in_day
+        grouped[f"day{day}_sum"] = in_day * points
+        grouped[f"day{day}_sq"] = in_day * points**2
+
+    return grouped.groupby("team_number").sum()
+
+
+def get_team_stats(sums, teams):
+    count = sums["count"]
+    means = sums.div(count, axis=0)
+    # the p-value needs at least 2 days to compare
+    day_counts = sums.filter(regex=r"^day\d+_count$")
+    multiple_days = (day_counts.sum() > 0).sum() > 1
+
+    stats_df = pd.DataFrame(index=sums.index)
+    stats_df["team_number"] = sums.index
+    for stat_column, column in AVERAGE_COLUMNS.items():
+        stats_df[stat_column] = means[column].round(2)
+
+    stats_df["qualitative_sum"] = means["qualitative"].round(2)
+
+    # closed form of stats.linregress with x = 0, 1, ..., n - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = (count - 1) / 2
+        ssxm = count * (count**2 - 1) / 12
+        ssxym = sums["xy"] - count * x_mean * means["total_points"]
+        stats_df["lsrl_slope"] = (ssxym / ssxm).round(4)
+
+    stats_df["defense_percentage"] = (sums["is_defense"] * 100 / count).round(2)
+
+    stats_df["p_value"] = np.NaN
+    if multiple_days:
+        stats_df["p_value"] = get_day_p_values(sums).round(7)
+
+    stats_df = stats_df.loc[teams].reset_index(drop=True)
+
+    return stats_df
+
+
+def get_day_p_values(sums):
+    # one way anova of total points across every day the team played, for every team
+    # at once. with 2 days it's the same p-value as stats.ttest_ind (equal variances)
+    days = sums.filter(regex=r"^day\d+_count$").columns.str[: -len("_count")]
+    counts = sums[days + "_count"].to_numpy()
+    totals = sums[days + "_sum"].to_numpy()
+    squares = sums[days + "_sq"].to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = counts.sum(axis=1)
+        groups = (counts > 0).sum(axis=1)
+        # sum of (day total)^2 / (day count), skipping the days a team didn't play
+        day_squares = np.where(counts > 0, totals**2 / counts, 0).sum(axis=1)
+        ss_between = day_squares - totals.sum(axis=1) ** 2 / n
+        # sum of squared deviations, so a single match on one day still counts
+        ss_within = squares.sum(axis=1) - day_squares
+        dof_between = groups - 1
+        dof_within = n - groups
+        f = (ss_between / dof_between) / (ss_within / dof_within)
+        p_value = stats.f.sf(f, dof_between, dof_within)
+
+    p_value = pd.Series(p_value, index=sums.index)
+    p_value[(dof_between <= 0) | (dof_within <= 0)] = np.NaN
+
+    return p_value
+
+
+def get_rating_penalties(num_teams, num_scouts, num_matches):
+    return np.repeat(
+        [
+            RATING_PENALTIES["team"],
+            RATING_PENALTIES["scout"],
+            RATING_PENALTIES["match"],
+        ],
+        [num_teams, num_scouts, num_matches],
+    )
+
+
+def get_rating_design(df):
+    # one row per scouted robot, with a 1 in the columns for its team, its scout and
+    # its match, so scout bias and weird matches don't all land on the team
+    team_codes, teams = pd.factorize(df["team_number"])
+    scout_codes, scouts = pd.factorize(df["name"].astype(object).fillna(""))
+    match_columns = [column for column in ["event", "match_number"] if column in df]
+    match_codes, matches = pd.MultiIndex.from_frame(df[match_columns]).factorize()
+
+    labels = (
+        [("team", team) for team in teams]
+        + [("scout", scout) for scout in scouts]
+        + [("match",) + match for match in matches]
+    )
+    penalties = get_rating_penalties(len(teams), len(scouts), len(matches))
+
+    columns = np.column_stack(
+        [
+            team_codes,
+            len(teams) + scout_codes,
+            len(teams) + len(scouts) + match_codes,
+        ]
+    )
+    design = sparse.csr_matrix(
+        (
+            np.ones(columns.size),
+            (np.repeat(np.arange(len(df)), columns.shape[1]), columns.ravel()),
+        ),
+        shape=(len(df), len(labels)),
+    )
+
+    return design, labels, penalties, teams
+
+
+def get_ratings(df, solutions=None):
+    # ridge regression of every metric on team + scout + match, solved with conjugate
+    # gradient on the normal equations. solutions (watch mode) keeps the last answer
+    # around so the next solve starts from it instead of from zero
+    design, labels, penalties, teams = get_rating_design(df)
+    normal = (design.T @ design + sparse.diags(penalties)).tocsr()
+
+    targets = {}
+    for metric in RATING_METRICS:
+        values = df[metric].to_numpy(dtype=float)
+        mean = values.mean()
+        targets[metric] = (mean, design.T @ (values - mean))
+
+    return solve_ratings(normal, targets, labels, teams, solutions)
+
+
+def solve_ratings(normal, targets, labels, teams, solutions=None):
+    # targets is metric -> (mean, design.T @ (values - mean))
+    ratings = pd.DataFrame(index=teams)
+    for metric, column in RATING_METRICS.items():
+        mean, target = targets[metric]
+
+        x0 = None
+        if solutions is not None and metric in solutions:
+            x0 = np.array([solutions[metric].get(label, 0.0) for label in labels])
+
+        x, _ = cg(normal, target, x0=x0, tol=1e-10, atol=0)
+        ratings[column] = (mean + x[: len(teams)]).round(2)
+
+        if solutions is not None:
+            solutions[metric] = dict(zip(labels, x.tolist()))
+
+    return ratings
+
+
+# how many resamples --bootstrap does unless it's told otherwise
+BOOTSTRAP_RESAMPLES = 2000
+
+
+def get_bootstrap_intervals(
+    df, teams, resamples, confidence=0.95, seed=0, batch_size=2_000_000
+):
+    # confidence intervals for every average in the rankings, for every team at once.
+    # the rows get lined up team by team, so one resample is just one index array
+    # where every row picks a random row from the same team
+    rows = df.loc[df["team_number"].isin(teams)]
+    values = rows[list(AVERAGE_COLUMNS.values())].astype(float)
+    values["qualitative"] = rows.filter(regex="rank_").sum(axis=1)
+    stat_columns = list(AVERAGE_COLUMNS) + ["qualitative_sum"]
+    indices = rows.groupby("team_number").indices
+
+    positions = np.concatenate([indices[team] for team in teams])
+    counts = np.array([len(indices[team]) for team in teams])
+    starts = np.cumsum(counts) - counts
+    row_starts = np.repeat(starts, counts)
+    row_counts = np.repeat(counts, counts)
+    values = values.to_numpy()[positions]
+
+    rng = np.random.default_rng(seed)
+    means = np.empty((resamples, len(teams), len(stat_columns)))
+    # as many resamples at a time as fit in a few million numbers
+    step = max(batch_size // len(positions), 1)
+    for start in range(0, resamples, step):
+        batch = slice(start, min(start + step, resamples))
+        draws = rng.random((batch.stop - batch.start, len(positions)))
+        draws = row_starts + (draws * row_counts).astype(int)
+        for i in range(len(stat_columns)):
+            sums = np.add.reduceat(values[:, i][draws], starts, axis=1)
+            means[batch, :, i] = sums / counts
+
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha], axis=0)
+    intervals = pd.DataFrame(index=pd.Index(teams, name="team_number"))
+    for i, column in enumerate(stat_columns):
+        intervals[f"{column}_low"] = low[:, i].round(2)
+        intervals[f"{column}_high"] = high[:, i].round(2)
+
+    return intervals
+
+
+def get_rankings(
+    df,
+    teams,
+    sums=None,
+    rating_solutions=None,
+    resamples=0,
+    by_lower_bound=False,
+    ratings=None,
+):
     stats_columns = [
         "team_number",
         "average_total_points",
@@ -204,76 +1590,26 @@ def get_rankings(df, teams):
         "lsrl_slope",
         "defense_percentage",
         "p_value",
-    ]
-    stats_df = pd.DataFrame(columns=stats_columns)
-
-    for team in teams:
-        cur_df = pd.DataFrame(columns=stats_columns)
-
-        cur_df["team_number"] = [team]
-        cur_df[
-            [
-                "average_total_points",
-                "average_auto_points",
-                "average_num_cycles",
-                "average_charge_station_points",
-                "average_teleop_points",
-            ]
-        ] = (
-            df.loc[df["team_number"] == team][
-                [
-                    "total_points",
-                    "auto_points",
-                    "num_cycles",
-                    "charge_station_points",
-                    "tele_points",
-                ]
-            ]
-            .mean(axis=0)
-            .round(2)
-        )
-
-        slope, _, _, _, _ = stats.linregress(
-            range(0, len(df.loc[df["team_number"] == team]["total_points"])),
-            df.loc[df["team_number"] == team]["total_points"],
-        )
-        slope = round(slope, 4)
-
-        p_value = np.NaN
-        if len(pd.unique(df["timestamp"])) != 1:
-            p_value = round(
-                stats.ttest_ind(
-                    df.loc[df["team_number"] == team]["total_points"][
-                        df["timestamp"] == 1
-                    ],
-                    df.loc[df["team_number"] == team]["total_points"][
-                        df["timestamp"] == 2
-                    ],
-                ).pvalue,
-                7,
-            )
-
-        defense_percentage = round(
-            len(df.loc[(df["team_number"] == team) & (df["defense"] == "Yes")])
-            * 100
-            / len(df.loc[df["team_number"] == team]["defense"]),
-            2,
-        )
-
-        cur_df["lsrl_slope"] = [slope]
-        cur_df["p_value"] = [p_value]
-        cur_df["defense_percentage"] = [defense_percentage]
-        cur_df["qualitative_sum"] = [
-            round(
-                df.loc[df["team_number"] == team]
-                .filter(regex="rank_")
-                .sum(axis=1)
-                .mean(),
-                2,
-            )
-        ]
-
-        stats_df = pd.concat([stats_df, cur_df])
+    ] + list(RATING_METRICS.values())
+    if sums is None:
+        sums = get_team_sums(df)
+    stats_df = get_team_stats(sums, teams)
+    if ratings is None:
+        ratings = get_ratings(df, rating_solutions)
+    for column in RATING_METRICS.values():
+        stats_df[column] = ratings.loc[teams, column].to_numpy()
+    stats_df = stats_df[stats_columns]
+
+    # averages get a low/high column next to them if we're bootstrapping
+    intervals = {}
+    if resamples > 0:
+        bootstrap = get_bootstrap_intervals(df, teams, resamples)
+        for column in list(AVERAGE_COLUMNS) + ["qualitative_sum"]:
+            low = bootstrap[f"{column}_low"].to_numpy()
+            high = bootstrap[f"{column}_high"].to_numpy()
+            stats_df[f"{column}_low"] = low
+            stats_df[f"{column}_high"] = high
+            intervals[column] = (low, high)
 
     formatted_columns = [
         "Total Points",
@@ -285,24 +1621,314 @@ def get_rankings(df, teams):
         "LSRL Slope",
         "Defense %",
         "P-value",
+        "Points Rating",
+        "Auto Rating",
+        "Cycles Rating",
     ]
 
-    rankings = pd.DataFrame()
-    rankings["#"] = range(1, len(teams) + 1)
+    rankings = {"#": range(1, len(teams) + 1)}
+    team_numbers = np.asarray(teams)
     for i, column in enumerate(stats_columns):
         if i == 0:
             continue
-        temp_df = pd.DataFrame()
-        temp_df[f"Team{i}"] = teams
-        temp_df[formatted_columns[i - 1]] = stats_df[column].values
-        temp_df = temp_df.sort_values(
-            by=[formatted_columns[i - 1]],
-            ascending=(column == "p_value"),
-            ignore_index=True,
+        values = stats_df[column].to_numpy(dtype=float)
+        if by_lower_bound and column in intervals:
+            order = get_rank_order(intervals[column][0])
+        else:
+            order = get_rank_order(values, ascending=(column == "p_value"))
+        rankings[f"Team{i}"] = team_numbers[order]
+        rankings[formatted_columns[i - 1]] = values[order]
+        if column in intervals:
+            low, high = intervals[column]
+            rankings[f"{formatted_columns[i - 1]} Low"] = low[order]
+            rankings[f"{formatted_columns[i - 1]} High"] = high[order]
+
+    return pd.DataFrame(rankings), stats_df
+
+
+def get_rank_order(values, ascending=False):
+    # stable sort, so tied teams always stay in team number order (nan goes last)
+    return np.argsort(values if ascending else -values, kind="stable")
+
+
+def is_team_column(column):
+    # the rankings go Team1, Total Points, (Total Points Low/High), Team2, ...
+    return column.startswith("Team") and column[4:].isdigit()
+
+
+def get_rank_index(rankings):
+    # team -> {category: rank}, straight from the rankings sheet's columns,
+    # so the team sheets never have to search through the rankings
+    rank_index = {}
+    columns = rankings.columns.tolist()
+    for i, column in enumerate(columns):
+        if not is_team_column(column):
+            continue
+        category = columns[i + 1]
+        for rank, team in enumerate(rankings[column].tolist(), 1):
+            rank_index.setdefault(team, {})[category] = rank
+
+    return rank_index
+
+
+def get_rank_formulas(rankings):
+    # category -> excel formula for a team's rank (with {team} left to fill in), which
+    # looks the team up in the rankings sheet's column instead of copying the number
+    formulas = {}
+    columns = rankings.columns.tolist()
+    for i, column in enumerate(columns):
+        if is_team_column(column):
+            letter = xl_col_to_name(i)
+            formulas[columns[i + 1]] = (
+                f"=MATCH({{team}},rankings!${letter}:${letter},0)-1"
+            )
+
+    return formulas
+
+
+def get_event_rankings(df, teams, resamples=0, by_lower_bound=False):
+    # same as the season rankings, just only counting the rows from each event
+    event_rankings = {}
+    for event, event_df in df.groupby("event", sort=False):
+        event_teams = set(event_df["team_number"])
+        event_teams = [team for team in teams if team in event_teams]
+        event_rankings[event], _ = get_rankings(
+            event_df,
+            event_teams,
+            resamples=resamples,
+            by_lower_bound=by_lower_bound,
+        )
+
+    return event_rankings
+
+
+# every field data column simulate_alliances uses
+PICK_LIST_COLUMNS = [
+    "team_number",
+    "total_points",
+    "auto_points",
+    "charge_station_points",
+    "auto_balance",
+]
+
+
+def get_match_samples(field_df, teams, simulations, rng):
+    # a random one of every team's real matches for each simulated match, so a
+    # team's good and bad matches stay together. shape is teams x simulations
+    columns = ["total_points", "auto_points", "charge_station_points", "auto_balance"]
+    rows = field_df.loc[field_df["team_number"].isin(teams)]
+    values = rows[columns].astype(float).fillna(0).to_numpy()
+    indices = rows.groupby("team_number").indices
+
+    positions = np.concatenate([indices[team] for team in teams])
+    counts = np.array([len(indices[team]) for team in teams])
+    starts = np.cumsum(counts) - counts
+    draws = starts[:, None] + (rng.random((len(teams), simulations)) * counts[:, None])
+    samples = values[positions[draws.astype(int)]]
+
+    return {column: samples[:, :, i] for i, column in enumerate(columns)}
+
+
+def get_undominated(total, auto_balance, list_size, grid_size=21):
+    # only one auto dock counts, so a partner adds somewhere between their points
+    # without the auto dock and all of their points, depending on who else docked. if
+    # even the low end of another partner beats the high end of this one at every
+    # percentile, swapping that one in is always better. a partner that more than
+    # list_size others beat like that can't be in the best list_size pairs, since
+    # each of those others makes a better pair with whoever the second partner is
+    grid = np.linspace(0, 1, grid_size)
+    highs = np.quantile(total, grid, axis=1).T
+    lows = np.quantile(total - auto_balance, grid, axis=1).T
+    at_least = (lows[:, None, :] >= highs[None, :, :]).all(axis=2)
+    better = (lows[:, None, :] > highs[None, :, :]).any(axis=2)
+    dominators = (at_least & better).sum(axis=0)
+
+    return np.flatnonzero(dominators <= list_size)
+
+
+def get_alliance_scores(samples, members):
+    # only one robot's auto dock counts, everything else just adds up
+    auto_balance = samples["auto_balance"]
+    total = samples["total_points"][members].sum(axis=0)
+    auto = samples["auto_points"][members].sum(axis=0)
+    docked = auto_balance[members].sum(axis=0) - auto_balance[members].max(axis=0)
+
+    return total - docked, auto - docked
+
+
+def simulate_alliances(
+    field_df,
+    teams,
+    our_team=1787,
+    target_alliance=None,
+    simulations=5000,
+    seed=0,
+    batch_size=2_000_000,
+    list_size=50,
+):
+    # every alliance of our team + 2 partners over the same simulated matches. pairs
+    # that can't make the top list_size get skipped (see get_undominated)
+    teams = [team for team in teams if team != our_team]
+    if target_alliance is None:
+        # whoever averages the most points, as the alliance we'd have to beat
+        averages = field_df.groupby("team_number")["total_points"].mean()
+        target_alliance = averages.loc[teams].nlargest(3).index.tolist()
+    target_alliance = list(target_alliance)
+    # the teams we're playing against can't also be our partners
+    teams = [team for team in teams if team not in target_alliance]
+
+    all_teams = [our_team] + teams + target_alliance
+    rng = np.random.default_rng(seed)
+    samples = get_match_samples(field_df, all_teams, simulations, rng)
+    # the target alliance gets its own draws from the end of the samples
+    target_members = np.arange(len(all_teams) - len(target_alliance), len(all_teams))
+    target_score, _ = get_alliance_scores(samples, target_members)
+
+    partners = slice(1, len(teams) + 1)
+    candidates = 1 + get_undominated(
+        samples["total_points"][partners], samples["auto_balance"][partners], list_size
+    )
+    first, second = np.triu_indices(len(candidates), 1)
+    first, second = candidates[first], candidates[second]
+
+    total = samples["total_points"]
+    auto = samples["auto_points"]
+    auto_balance = samples["auto_balance"]
+    endgame = samples["charge_station_points"].mean(axis=1)
+
+    expected_score = np.empty(len(first))
+    expected_auto = np.empty(len(first))
+    win_chance = np.empty(len(first))
+    # enough pairs at a time to stay at a few million numbers per array
+    step = max(batch_size // simulations, 1)
+    for start in range(0, len(first), step):
+        batch = slice(start, start + step)
+        i, j = first[batch], second[batch]
+        docked = auto_balance[0] + auto_balance[i] + auto_balance[j]
+        docked -= np.maximum(
+            auto_balance[0], np.maximum(auto_balance[i], auto_balance[j])
+        )
+        score = total[0] + total[i] + total[j] - docked
+        expected_score[batch] = score.mean(axis=1)
+        expected_auto[batch] = (auto[0] + auto[i] + auto[j] - docked).mean(axis=1)
+        # ties count as half a win
+        wins = (score > target_score) + (score == target_score) / 2
+        win_chance[batch] = wins.mean(axis=1)
+
+    team_numbers = np.asarray(all_teams)
+    picks = pd.DataFrame(
+        {
+            "Partner 1": team_numbers[first],
+            "Partner 2": team_numbers[second],
+            "Expected Score": expected_score.round(2),
+            "Win %": (win_chance * 100).round(2),
+            "Expected Auto": expected_auto.round(2),
+            "Expected Endgame": (endgame[0] + endgame[first] + endgame[second]).round(
+                2
+            ),
+        }
+    )
+    picks = picks.sort_values(
+        ["Win %", "Expected Score"], ascending=False, kind="stable", ignore_index=True
+    )
+
+    return picks, target_alliance
+
+
+# "column op number", e.g. average_auto_points>=12
+QUERY_PATTERN = re.compile(r"\s*(\w+)\s*(>=|<=|==|!=|>|<|=)\s*(\S+)\s*")
+
+
+def build_query_index(stats_df):
+    # every numeric stats column sorted once (nan left out), so each filter is just a
+    # binary search instead of a scan over every team
+    index = {}
+    for column in stats_df.columns:
+        if not pd.api.types.is_numeric_dtype(stats_df[column]):
+            continue
+        values = stats_df[column].to_numpy(dtype=float)
+        order = np.argsort(values, kind="stable")
+        count = np.count_nonzero(~np.isnan(values))
+        index[column] = (values[order][:count], order[:count])
+
+    return index
+
+
+def parse_filter(text, index):
+    match = QUERY_PATTERN.fullmatch(text)
+    if match is None:
+        raise ValueError(
+            f"can't read the filter {text!r}, it should look like average_auto_points>=12"
+        )
+    column, op, value = match.groups()
+
+    # auto_points works for average_auto_points too
+    if column not in index and f"average_{column}" in index:
+        column = f"average_{column}"
+    if column not in index:
+        raise ValueError(
+            f"{column} isn't a stats column, try one of {', '.join(index)}"
+        )
+
+    try:
+        value = float(value)
+    except ValueError:
+        raise ValueError(f"{value!r} in the filter {text!r} isn't a number")
+
+    return column, "==" if op == "=" else op, value
+
+
+def get_filter_rows(index, column, op, value):
+    values, order = index[column]
+    left = np.searchsorted(values, value, side="left")
+    right = np.searchsorted(values, value, side="right")
+
+    if op == ">=":
+        rows = order[left:]
+    elif op == ">":
+        rows = order[right:]
+    elif op == "<=":
+        rows = order[:right]
+    elif op == "<":
+        rows = order[:left]
+    elif op == "==":
+        rows = order[left:right]
+    else:
+        rows = np.concatenate([order[:left], order[right:]])
+
+    return np.sort(rows)
+
+
+def query_teams(stats_df, filters, sort_by=None, index=None):
+    # every team in stats_df that passes all the filters, e.g.
+    # query_teams(stats_df, ["auto_points>=12", "defense_percentage<20", "lsrl_slope>0"])
+    # sort_by is a list of columns, biggest first unless there's a + in front.
+    # pass in index from build_query_index to reuse it between queries
+    if index is None:
+        index = build_query_index(stats_df)
+
+    matches = [get_filter_rows(index, *parse_filter(text, index)) for text in filters]
+    rows = np.arange(len(stats_df))
+    # smallest first, so the intersection only ever gets smaller
+    for filter_rows in sorted(matches, key=len):
+        rows = np.intersect1d(rows, filter_rows, assume_unique=True)
+
+    result = stats_df.iloc[rows]
+    if sort_by:
+        columns = [column.lstrip("+") for column in sort_by]
+        for column in columns:
+            if column not in stats_df.columns:
+                raise ValueError(
+                    f"can't sort by {column}, it isn't a stats column, try one of"
+                    f" {', '.join(stats_df.columns)}"
+                )
+        result = result.sort_values(
+            columns,
+            ascending=[column.startswith("+") for column in sort_by],
+            kind="stable",
         )
-        rankings = pd.concat([rankings, temp_df], axis=1, sort=False)
 
-    return rankings, stats_df
+    return result.reset_index(drop=True)
 
 
 def process_args():
@@ -319,51 +1945,383 @@ def process_args():
     parser.add_argument(
         "--field_path",
         type=str,
-        help="path to field scouting csv (probably somewhere in ~/Downloads).",
+        nargs="+",
+        help="path to field scouting csv (probably somewhere in ~/Downloads), or the .db that --ingest saves to. give more than one csv, or a folder of them, to load a whole season (one csv per event).",
         default="",
     )
     parser.add_argument(
         "--pit_path",
         type=str,
-        help="path to pit scouting csv (probably somewhere in ~/Downloads).",
+        nargs="+",
+        help="path to pit scouting csv (probably somewhere in ~/Downloads). can also be more than one csv, or a folder of them.",
+        default="",
+    )
+
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        help="where to cache the parsed field csv between runs (empty string turns it off).",
+        default=".scouting_cache",
+    )
+    parser.add_argument(
+        "--output_format",
+        nargs="+",
+        choices=["xlsx", "csv", "json", "parquet", "html"],
+        help="what to write; anything other than xlsx goes in --output_dir and skips the workbook. can list more than one.",
+        default=["xlsx"],
+    )
+    parser.add_argument(
+        "--teams_per_file",
+        type=int,
+        help="split the output into workbooks of this many teams each, written in parallel (0 keeps everything in output.xlsx).",
+        default=0,
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        help="where the split workbooks (--teams_per_file) and other --output_format files go.",
+        default="output",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="how many processes to load a season / write split workbooks with (defaults to every core).",
+        default=None,
+    )
+    parser.add_argument(
+        "--constant_memory",
+        action="store_true",
+        help="write the workbook row by row so memory use stays flat no matter how big the event is.",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="only rewrite the team sheets in output.xlsx that changed since the last --update run (always writes like --constant_memory).",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        help="how many bootstrap resamples to use for the 95%% confidence intervals next to every average in the rankings (0 turns them off). defaults to 2000, or 0 with --sql.",
+        default=None,
+    )
+    parser.add_argument(
+        "--rank_by_lower_bound",
+        action="store_true",
+        help="rank the averages by the low end of their confidence interval, so teams with only a few good matches don't end up on top.",
+    )
+    parser.add_argument(
+        "--query",
+        type=str,
+        nargs="+",
+        help="just print the teams that pass every filter (like average_auto_points>=12 defense_percentage<20 lsrl_slope>0) instead of writing any output.",
+        default=None,
+    )
+    parser.add_argument(
+        "--query_sort",
+        type=str,
+        nargs="+",
+        help="columns to sort --query results by, biggest first unless there's a + in front (e.g. +p_value).",
+        default=["average_total_points"],
+    )
+    parser.add_argument(
+        "--reconcile",
+        type=str,
+        choices=RECONCILE_POLICIES,
+        help="what to do with more than one row for the same team in the same match: none (just report them), latest (keep the last one), median (median of every answer) or trust (average weighted by --scout_trust). exact copies always only count once unless it's none.",
+        default="none",
+    )
+    parser.add_argument(
+        "--scout_trust",
+        type=str,
+        nargs="+",
+        help="how much to trust each scout for --reconcile trust, as name=weight (everyone else is 1).",
+        default=None,
+    )
+    parser.add_argument(
+        "--pick_list",
+        action="store_true",
+        help="simulate every alliance of --our_team + 2 partners and save the best ones to pick_list in --output_dir.",
+    )
+    parser.add_argument(
+        "--our_team", type=int, help="whose pick list it is.", default=1787
+    )
+    parser.add_argument(
+        "--target_alliance",
+        type=int,
+        nargs=3,
+        help="the 3 teams the pick list alliances get simulated against (defaults to the 3 best by average total points).",
+        default=None,
+    )
+    parser.add_argument(
+        "--simulations",
+        type=int,
+        help="how many matches to simulate for every alliance.",
+        default=5000,
+    )
+    parser.add_argument(
+        "--memory_report",
+        action="store_true",
+        help="print how much memory every field data column takes, as plain read_csv output vs. how it's actually kept.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print how long (and how much memory) every step took, plus every team sheet.",
+    )
+    parser.add_argument(
+        "--profile_json",
+        type=str,
+        help="also save the --profile numbers to this json file.",
+        default="",
+    )
+    parser.add_argument(
+        "--profile_cprofile",
+        type=str,
+        help="save a cProfile of the slowest step to this file (turns on --profile, and slows things down).",
         default="",
     )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and update the output whenever the field csv changes",
+    )
+    parser.add_argument(
+        "--watch_interval",
+        type=float,
+        help="how many seconds to wait between checking the field csv in watch mode",
+        default=5,
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="serve the rankings and team pages over http instead of writing output, updating them whenever the field csv changes (checked every --watch_interval seconds)",
+    )
+    parser.add_argument(
+        "--sql",
+        action="store_true",
+        help="with a .db --field_path, do the averages, histograms and day means in sqlite instead of loading every row (team rows only get read while their sheet is written).",
+    )
+    parser.add_argument(
+        "--ingest",
+        action="store_true",
+        help="take field scouting rows from the scouts' devices over http (POST /submit) and save them to --field_path, which has to be a .db file",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        help="address --serve and --ingest listen on (0.0.0.0 lets other devices on the network connect).",
+        default="0.0.0.0",
+    )
+    parser.add_argument(
+        "--port", type=int, help="port --serve and --ingest listen on.", default=1787
+    )
 
     args = parser.parse_args()
+    if args.bootstrap is None:
+        args.bootstrap = BOOTSTRAP_RESAMPLES
+        # resampling needs every row, which is the thing --sql doesn't load
+        if args.sql:
+            print(
+                "--sql leaves out the confidence intervals since they need every row,"
+                " add --bootstrap 2000 to get them anyway"
+            )
+            args.bootstrap = 0
 
     return args
 
 
-def create_spreadsheet(teams, field_df, stats_df, rankings, pit_df):
-    colors = list(Color("orange").range_to(Color("grey"), len(teams)))
-    workbook = xlsxwriter.Workbook("output.xlsx")
-    writer = pd.ExcelWriter("output.xlsx", engine="xlsxwriter")
-    stats_worksheet = workbook.add_worksheet("Rankings")
+def get_team_views(teams, field_df, stats_df, rankings, pit_df):
+    # splits everything up by team once so create_spreadsheet only has to look stuff up
+    if isinstance(field_df, str):
+        return get_db_team_views(field_df, teams, stats_df, rankings, pit_df)
 
-    rankings.to_excel(
-        writer, sheet_name="rankings", index=False, startrow=0, startcol=0
-    )
+    data_columns = list(TEAM_DATA_COLUMNS)
+    groups = field_df.groupby("team_number", sort=False)
+    row_indices = groups.indices
+    averages = groups[data_columns].mean().round(2)
 
-    cell_format = writer.book.add_format(
-        {"bg_color": "white", "border": 1, "valign": "center"}
+    def histogram(column, values):
+        counts = (
+            field_df.groupby(["team_number", column], observed=True)
+            .size()
+            .unstack(fill_value=0)
+        )
+        return counts.reindex(columns=values, fill_value=0)
+
+    auto_balance = histogram("auto_balance", [12, 8, 0])
+    tele_balance = histogram("tele_balance", [10, 6, 0])
+    defense = histogram("defense", ["Yes", "No", "Not sure"])
+    day_means = (
+        field_df.groupby(["team_number", "timestamp"])["total_points"].mean().unstack()
     )
+    summaries = {
+        "averages": averages,
+        "auto_balance": auto_balance,
+        "tele_balance": tele_balance,
+        "defense": defense,
+        "day_means": day_means,
+    }
+
+    return build_team_views(
+        teams,
+        lambda team: field_df.take(row_indices[team]),
+        summaries,
+        stats_df,
+        rankings,
+        pit_df,
+    )
+
+
+def build_team_views(teams, get_rows, summaries, stats_df, rankings, pit_df):
+    # summaries are team-indexed tables of averages, histograms and day means.
+    # get_rows(team) is the team's matches, or a function that gets them
+    day_means = summaries["day_means"]
+    days = day_means.columns.tolist()
+    stats_indices = stats_df.groupby("team_number", sort=False).indices
+    rank_index = get_rank_index(rankings)
+
+    pit_records = {}
+    if isinstance(pit_df, pd.DataFrame):
+        # already one row per team, indexed by team number
+        pit_records = pit_df.to_dict("index")
+
+    views = {}
+    for team in teams:
+        views[team] = {
+            "rows": get_rows(team),
+            "averages": summaries["averages"].loc[team],
+            "auto_balance": summaries["auto_balance"].loc[team].tolist(),
+            "tele_balance": summaries["tele_balance"].loc[team].tolist(),
+            "defense": summaries["defense"].loc[team].tolist(),
+            "day_means": day_means.loc[team].dropna().to_dict(),
+            "days": days,
+            "stats": stats_df.take(stats_indices[team]),
+            "ranks": rank_index[team],
+            "pit": pit_records.get(team),
+        }
+
+    return views
+
+
+def get_formats(workbook):
+    # every format gets made once per workbook instead of inside the team loop
+    return {
+        "header": workbook.add_format(
+            {"border": 1, "bold": True, "bg_color": "#FFD580", "valign": "center"}
+        ),
+        "bold": workbook.add_format({"border": 1, "bold": True}),
+        # same look pandas gave the rankings header when this used to_excel
+        "rankings_header": workbook.add_format(
+            {"border": 1, "bold": True, "align": "center", "valign": "top"}
+        ),
+        "cell": workbook.add_format(
+            {"bg_color": "white", "border": 1, "valign": "center"}
+        ),
+        "1787": workbook.add_format({"bg_color": "#FFD580", "border": 1}),
+        "data": workbook.add_format({"valign": "center"}),
+    }
+
+
+# the xlsxwriter versions --update's patching got checked against, since it numbers
+# the formats with one of xlsxwriter's private methods (see create_workbook). any
+# other version just gets the whole workbook rewritten every time
+PATCH_XLSXWRITER_VERSIONS = ("3.0.",)
+
+
+def can_patch_workbooks():
+    return xlsxwriter.__version__.startswith(PATCH_XLSXWRITER_VERSIONS)
+
+
+def create_workbook(output_path, constant_memory=False, fixed_styles=False):
+    # constant_memory flushes every row to disk as soon as a later row gets written,
+    # so everything below has to write its cells top to bottom
+    workbook = xlsxwriter.Workbook(output_path, {"constant_memory": constant_memory})
+    formats = get_formats(workbook)
+    if fixed_styles and can_patch_workbooks():
+        # xlsxwriter numbers formats in the order they first get used, so a workbook
+        # with only some of the team sheets could number them differently. numbering
+        # every format up front keeps styles.xml the same no matter which sheets get
+        # written, which --update needs to move sheets between workbooks
+        for cell_format in formats.values():
+            cell_format._get_xf_index()
+
+    return workbook, formats
+
+
+def add_cells(cells, row, col, values, cell_format=None):
+    for i, value in enumerate(values):
+        # nan/None stay empty, like to_excel did
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            continue
+        cells.setdefault(row, {})[col + i] = (value, cell_format)
+
+
+def write_cells(worksheet, cells, merges=None):
+    # writes row by row, one write_row for every run of cells next to each other
+    merges = merges or {}
+    for row in sorted(set(cells) | set(merges)):
+        if row in merges:
+            worksheet.merge_range(row, *merges[row])
+
+        row_cells = cells.get(row, {})
+        cols = sorted(row_cells)
+        start = 0
+        for end in range(1, len(cols) + 1):
+            # formulas are (formula, value) and always get written on their own
+            if isinstance(row_cells[cols[start]][0], tuple):
+                formula, value = row_cells[cols[start]][0]
+                worksheet.write_formula(
+                    row, cols[start], formula, row_cells[cols[start]][1], value
+                )
+                start = end
+            elif (
+                end == len(cols)
+                or cols[end] != cols[end - 1] + 1
+                or row_cells[cols[end]][1] is not row_cells[cols[start]][1]
+                or isinstance(row_cells[cols[end]][0], tuple)
+            ):
+                worksheet.write_row(
+                    row,
+                    cols[start],
+                    [row_cells[col][0] for col in cols[start:end]],
+                    row_cells[cols[start]][1],
+                )
+                start = end
 
-    format_1787 = writer.book.add_format({"bg_color": "#FFD580", "border": 1})
 
-    data_format = writer.book.add_format({"valign": "center"})
+def write_rankings_sheet(workbook, formats, rankings, teams):
+    worksheet = workbook.add_worksheet("rankings")
+
+    cells = {}
+    add_cells(cells, 0, 0, rankings.columns.tolist(), formats["rankings_header"])
+    for i, values in enumerate(rankings.to_numpy().tolist()):
+        add_cells(cells, i + 1, 0, values)
+
+    value_columns = [
+        i
+        for i, column in enumerate(rankings.columns)
+        if i > 0 and not is_team_column(column)
+    ]
+    for i in value_columns:
+        worksheet.set_column(i, i, 15, formats["data"])
+
+    write_cells(worksheet, cells)
 
-    writer.sheets["rankings"].conditional_format(
-        "A1:O100",
+    worksheet.conditional_format(
+        0,
+        0,
+        max(len(teams), 99),
+        len(rankings.columns) - 1,
         {
             "type": "cell",
             "criteria": "==",
             "value": 1787,
-            "format": format_1787,
+            "format": formats["1787"],
         },
     )
 
-    for i in range(2, 18, 2):
-        writer.sheets["rankings"].conditional_format(
+    for i in value_columns:
+        worksheet.conditional_format(
             1,
             i,
             len(teams),
@@ -372,358 +2330,717 @@ def create_spreadsheet(teams, field_df, stats_df, rankings, pit_df):
                 "type": "cell",
                 "criteria": ">",
                 "value": -99999999999,
-                "format": cell_format,
+                "format": formats["cell"],
             },
         )
-        writer.sheets["rankings"].set_column(i, i, 15, data_format)
 
-    data_columns = [
-        "match_number",
-        "total_points",
-        "tele_points",
-        "auto_points",
-        "num_cycles",
-        "charge_station_points",
-        # "high_points",
-        # "mid_points",
-        # "low_points",
-        # "cone_points",
-        # "cube_points",
-        "overall_rank",
-        "rank_auto",
-        "rank_speed",
-        "rank_pick_up",
-        "rank_placement",
-        "rank_driver",
-        "rank_balanced",
-        "rank_pick",
-    ]
-    # df.loc[df["team_number"] == team].filter(regex="rank").mean(axis=0).sum()
 
-    formatted_data_columns = [
-        "Match #",
-        "Total Points",
-        "Teleop Points",
-        "Auto Points",
-        "# of Cycles",
-        "Endgame Balance",
-        # "High Points",
-        # "Mid Points",
-        # "Low Points",
-        # "Cone Points",
-        # "Cube Points",
-        "Combined Score",
-        "Auto Score",
-        "Speed Score",
-        "Pickup Score",
-        "Placement Score",
-        "Driver Score",
-        "Balanced Score",
-        "Pick? Score",
-    ]
+def write_team_sheet(workbook, formats, team, view, tab_color, rank_formulas=None):
+    data_columns = list(TEAM_DATA_COLUMNS)
+    formatted_data_columns = list(TEAM_DATA_COLUMNS.values())
 
-    stats_columns = ["lsrl_slope", "defense_percentage", "p_value"]
+    stats_columns = list(TEAM_STATS_COLUMNS)
 
-    formatted_stats_columns = ["LSRL Slope", "Defense %", "P-value"]
+    formatted_stats_columns = list(TEAM_STATS_COLUMNS.values())
 
-    written_columns = ["name", "comments", "how_break"]
+    ranked_columns = TEAM_RANKED_COLUMNS
 
-    formatted_written_columns = ["Name", "Comments", "How break?"]
+    written_columns = list(TEAM_WRITTEN_COLUMNS)
 
-    color_idx = 0
+    formatted_written_columns = list(TEAM_WRITTEN_COLUMNS.values())
 
-    for team in teams:
-        print(f"Processing team {team}...")
-        # data side of stuff
-        averages = (
-            field_df.loc[field_df["team_number"] == team][data_columns]
-            .mean(axis=0)
-            .round(2)
-        )
-        averages = pd.DataFrame(averages).transpose()
-        averages["match_number"] = "N/A"
+    worksheet = workbook.add_worksheet(str(team))
+    cur_team = view["rows"]
+    # the sql backend only fetches a team's matches once its sheet is being written
+    if callable(cur_team):
+        cur_team = cur_team()
+    num_data_points = len(cur_team)
+    # matches + the averages row
+    table_length = num_data_points + 1
 
-        left_hand_column = [""] * (
-            len(field_df.loc[field_df["team_number"] == team]) + 1
-        )
-        left_hand_column[-1] = "Averages:"
+    # everything gets collected first and written at the end, top to bottom
+    cells = {}
 
-        team_data_df = pd.concat(
-            [field_df.loc[field_df["team_number"] == team][data_columns], averages],
-            axis=0,
-        )
-        team_data_df.columns = formatted_data_columns
-        team_data_df.insert(0, "", left_hand_column, True)
+    # data side of stuff
+    add_cells(cells, 0, 0, ["Matches:"], formats["header"])
+    add_cells(cells, 0, 1, formatted_data_columns, formats["header"])
+    add_cells(cells, 0, len(data_columns) + 1, [""], formats["header"])
+    for i, values in enumerate(cur_team[data_columns].to_numpy().tolist()):
+        add_cells(cells, i + 1, 1, values)
 
-        worksheet = workbook.add_worksheet(str(team))
+    averages = view["averages"].tolist()
+    averages[0] = "N/A"
+    add_cells(cells, table_length, 0, ["Averages:"] + averages)
 
-        team_data_df.to_excel(
-            writer, sheet_name=str(team), index=False, startrow=0, startcol=0
-        )
+    # qualitative info stuff
+    add_cells(
+        cells, 0, len(data_columns) + 2, formatted_written_columns, formats["header"]
+    )
+    for i, values in enumerate(cur_team[written_columns].to_numpy().tolist()):
+        add_cells(cells, i + 1, len(data_columns) + 2, values)
+
+    # rankings stuff
+    add_cells(cells, table_length + 3, 0, ["Category", "Ranking"], formats["header"])
+    for i, column in enumerate(ranked_columns):
+        rank = view["ranks"][column]
+        # with rank_formulas (from get_rank_formulas) the rank comes from the rankings
+        # sheet, so the sheet doesn't have to change every time the ranks do
+        if rank_formulas is not None:
+            rank = (rank_formulas[column].format(team=team), rank)
+        add_cells(cells, table_length + 4 + i, 0, [column, rank])
+
+    # stats stuff
+    add_cells(cells, table_length + 10, 0, formatted_stats_columns, formats["header"])
+    add_cells(
+        cells, table_length + 11, 0, view["stats"][stats_columns].iloc[0].tolist()
+    )
 
-        for i in range(0, len(data_columns) + 1):
-            writer.sheets[str(team)].set_column(i, i, width=12)
+    # pit scouting information
+    merges = {}
+    if view["pit"] is not None:
+        merges[table_length + 14] = [
+            0,
+            table_length + 14,
+            2,
+            "Pit Scouting Info",
+            formats["header"],
+        ]
 
-        # qualitative info stuff
-        team_written_df = field_df.loc[field_df["team_number"] == team][written_columns]
-        team_written_df.columns = formatted_written_columns
-        team_written_df.to_excel(
-            writer,
-            sheet_name=str(team),
-            index=False,
-            startrow=0,
-            startcol=len(data_columns) + 2,
-        )
-        writer.sheets[str(team)].set_column(
-            len(data_columns) + 3, len(data_columns) + 3, width=150
-        )
+        for i, (column, value) in enumerate(view["pit"].items()):
+            add_cells(cells, table_length + 15 + i, 0, [column], formats["bold"])
+            add_cells(cells, table_length + 15 + i, 1, [value])
+
+    # chart data, off to the side where nobody looks
+    add_cells(cells, 7, 49, ["Points"])
+    add_cells(cells, 49, 49, ["Cycles"])
+    for i, (points, cycles) in enumerate(
+        zip(cur_team["total_points"].tolist(), cur_team["num_cycles"].tolist())
+    ):
+        add_cells(cells, i, 50, [points])
+        add_cells(cells, i, 80, [cycles])
+
+    chart_labels = {
+        53: ["Docked (Engaged)", "Docked (Not Engaged)", "None"],
+        55: ["Docked (Engaged)", "Docked (Not Engaged)", "None"],
+        57: ["Offense", "Not Sure", "Defense"],
+        59: [f"Day {day}" for day in view["days"]],
+    }
+    chart_values = {
+        54: view["auto_balance"],
+        56: view["tele_balance"],
+        58: view["defense"],
+        60: [view["day_means"].get(day, np.NaN) for day in view["days"]],
+    }
+    for col, values in {**chart_labels, **chart_values}.items():
+        for i, value in enumerate(values):
+            add_cells(cells, i, col, [value])
+
+    for i in range(0, len(data_columns) + 1):
+        worksheet.set_column(i, i, width=12)
+    worksheet.set_column(len(data_columns) + 3, len(data_columns) + 3, width=150)
+    if view["pit"] is not None:
+        worksheet.set_column(0, 0, width=17)
+
+    write_cells(worksheet, cells, merges)
+
+    # chart 1: line graph of the total points
+    chart = workbook.add_chart({"type": "line", "subtype": "stacked"})
+    chart.add_series(
+        {
+            "name": [str(team), 7, 49],
+            "values": [str(team), 0, 50, num_data_points - 1, 50],
+            "line": {"color": "blue"},
+        }
+    )
 
-        # stats stuff
-        team_stats_df = stats_df.loc[stats_df["team_number"] == team][stats_columns]
-        team_stats_df.columns = formatted_stats_columns
-        team_stats_df.to_excel(
-            writer,
-            sheet_name=str(team),
-            index=False,
-            startrow=len(team_data_df) + 3 + 7,
-            startcol=0,
-        )
+    chart.set_x_axis({"name": "Match #"})
+    chart.set_y_axis({"name": "Total Points"})
 
-        workbook1 = writer.book
-        worksheet1 = writer.sheets[str(team)]
+    chart.set_title({"name": "Total Points"})
 
-        worksheet1.write(7, 49, "Points")
-        worksheet1.write(49, 49, "Cycles")
+    worksheet.insert_chart(table_length + 3, 5, chart)
 
-        num_data_points = len(field_df.loc[field_df["team_number"] == team])
-        cur_team = field_df.loc[field_df["team_number"] == team]
+    # chart 2: line graph of the cycles
+    chart = workbook.add_chart({"type": "line", "subtype": "stacked"})
+    chart.add_series(
+        {
+            "name": [str(team), 49, 49],
+            "values": [str(team), 0, 80, num_data_points - 1, 80],
+            "line": {"color": "blue"},
+        }
+    )
 
-        # rankings stuff
-        ranking_columns = [
-            "Total Points",
-            "Auto Points",
-            "# of Cycles",
-            "Endgame Balance",
-            "Qualitative Sum",
-        ]
+    chart.set_x_axis({"name": "Match #"})
+    chart.set_y_axis({"name": "Number of Cycles"})
 
-        cell_format = writer.book.add_format(
-            {"border": 1, "bold": True, "bg_color": "#FFD580", "valign": "center"}
-        )
+    chart.set_title({"name": "Number of Cycles"})
 
-        worksheet1.write(len(team_data_df) + 3, 0, "Category", cell_format)
-        worksheet1.write(len(team_data_df) + 3, 1, "Ranking", cell_format)
-        for i in range(1, 7):
-            if i == 5:
-                continue
-            cur_column = "Team" + str(i)
-            ranking = rankings.loc[rankings[cur_column] == team].index.tolist()[0] + 1
-            if i == 6:
-                worksheet1.write(
-                    len(team_data_df) + 3 + i - 1, 0, rankings.columns[i * 2]
-                )
-                worksheet1.write(len(team_data_df) + 3 + i - 1, 1, ranking)
-            else:
-                worksheet1.write(len(team_data_df) + 3 + i, 0, rankings.columns[i * 2])
-                worksheet1.write(len(team_data_df) + 3 + i, 1, ranking)
+    worksheet.insert_chart(table_length + 3, 11, chart)
 
-        # chart 1: line graph of the total points
-        for i, points in enumerate(
-            field_df.loc[field_df["team_number"] == team]["total_points"]
-        ):
-            worksheet1.write(i, 50, points)
+    # chart 3: pie chart of auto balancing distribution
+    chart = workbook.add_chart({"type": "pie"})
+    chart.add_series(
+        {
+            "categories": [str(team), 0, 53, 2, 53],
+            "values": [str(team), 0, 54, 2, 54],
+        }
+    )
 
-        chart = workbook1.add_chart({"type": "line", "subtype": "stacked"})
-        chart.add_series(
-            {
-                "name": [str(team), 7, 49],
-                "values": [str(team), 0, 50, num_data_points - 1, 50],
-                "line": {"color": "blue"},
-            }
-        )
+    chart.set_title({"name": "Autonomous Balancing Distribution"})
 
-        chart.set_x_axis({"name": "Match #"})
-        chart.set_y_axis({"name": "Total Points"})
+    worksheet.insert_chart(table_length + 3 + 16, 5, chart)
 
-        chart.set_title({"name": "Total Points"})
+    # chart 4: pie chart of tele balancing distribution
+    chart = workbook.add_chart({"type": "pie"})
+    chart.add_series(
+        {
+            "categories": [str(team), 0, 55, 2, 55],
+            "values": [str(team), 0, 56, 2, 56],
+        }
+    )
 
-        worksheet1.insert_chart(len(team_data_df) + 3, 5, chart)
+    chart.set_title({"name": "Teleoperated Balancing Distribution"})
 
-        # chart 2: pie graph with low, mid, high
-        for i, points in enumerate(
-            field_df.loc[field_df["team_number"] == team]["num_cycles"]
-        ):
-            worksheet1.write(i, 80, points)
+    worksheet.insert_chart(table_length + 3 + 16, 11, chart)
 
-        chart = workbook1.add_chart({"type": "line", "subtype": "stacked"})
-        chart.add_series(
-            {
-                "name": [str(team), 49, 49],
-                "values": [str(team), 0, 80, num_data_points - 1, 80],
-                "line": {"color": "blue"},
-            }
-        )
+    # chart 5: pie chart for defense
+    chart = workbook.add_chart({"type": "pie"})
+    chart.add_series(
+        {
+            "categories": [str(team), 0, 57, 2, 57],
+            "values": [str(team), 0, 58, 2, 58],
+        }
+    )
 
-        chart.set_x_axis({"name": "Match #"})
-        chart.set_y_axis({"name": "Number of Cycles"})
+    chart.set_title({"name": "Defense Distribution"})
 
-        chart.set_title({"name": "Number of Cycles"})
+    worksheet.insert_chart(table_length + 3 + 16 + 16, 5, chart)
 
-        worksheet1.insert_chart(len(team_data_df) + 3, 11, chart)
+    # chart 6: day 1 vs. day 2 (vs. day 3...)
+    chart = workbook.add_chart({"type": "column"})
 
-        # chart 3: pie chart of auto balancing distribution
-        worksheet1.write(0, 53, "Docked (Engaged)")
-        worksheet1.write(1, 53, "Docked (Not Engaged)")
-        worksheet1.write(2, 53, "None")
-        worksheet1.write(0, 54, len(cur_team.loc[cur_team["auto_balance"] == 12]))
-        worksheet1.write(1, 54, len(cur_team.loc[cur_team["auto_balance"] == 8]))
-        worksheet1.write(2, 54, len(cur_team.loc[cur_team["auto_balance"] == 0]))
+    num_days = len(view["days"])
+    chart.add_series(
+        {
+            "categories": [str(team), 0, 59, num_days - 1, 59],
+            "values": [str(team), 0, 60, num_days - 1, 60],
+            "name": [str(team), 7, 49],
+        }
+    )
 
-        chart = workbook1.add_chart({"type": "pie"})
-        chart.add_series(
-            {
-                "categories": [str(team), 0, 53, 2, 53],
-                "values": [str(team), 0, 54, 2, 54],
-            }
-        )
+    if num_days > 3:
+        chart.set_title({"name": "Points by Day"})
+    else:
+        chart.set_title({"name": " vs. ".join(chart_labels[59])})
+    worksheet.insert_chart(table_length + 3 + 16 + 16, 5 + 6, chart)
 
-        chart.set_title({"name": "Autonomous Balancing Distribution"})
+    # colors!
+    worksheet.set_tab_color(tab_color)
 
-        worksheet1.insert_chart(len(team_data_df) + 3 + 16, 5, chart)
 
-        # chart 4: pie chart of tele balancing distribution
-        worksheet1.write(0, 55, "Docked (Engaged)")
-        worksheet1.write(1, 55, "Docked (Not Engaged)")
-        worksheet1.write(2, 55, "None")
-        worksheet1.write(0, 56, len(cur_team.loc[cur_team["tele_balance"] == 10]))
-        worksheet1.write(1, 56, len(cur_team.loc[cur_team["tele_balance"] == 6]))
-        worksheet1.write(2, 56, len(cur_team.loc[cur_team["tele_balance"] == 0]))
+def create_spreadsheet(
+    teams, field_df, stats_df, rankings, pit_df, constant_memory=False
+):
+    colors = list(Color("orange").range_to(Color("grey"), len(teams)))
+    workbook, formats = create_workbook("output.xlsx", constant_memory)
 
-        chart = workbook1.add_chart({"type": "pie"})
-        chart.add_series(
-            {
-                "categories": [str(team), 0, 55, 2, 55],
-                "values": [str(team), 0, 56, 2, 56],
-            }
-        )
+    with profile_stage("rankings_sheet"):
+        write_rankings_sheet(workbook, formats, rankings, teams)
 
-        chart.set_title({"name": "Teleoperated Balancing Distribution"})
+    with profile_stage("get_team_views"):
+        views = get_team_views(teams, field_df, stats_df, rankings, pit_df)
 
-        worksheet1.insert_chart(len(team_data_df) + 3 + 16, 11, chart)
+    with profile_stage("team_sheets"):
+        for team, color in zip(teams, colors):
+            print(f"Processing team {team}...")
+            with profile_stage("team_sheet", team):
+                write_team_sheet(workbook, formats, team, views[team], color.hex)
 
-        # chart 5: pie chart for defense
-        worksheet1.write(0, 57, "Offense")
-        worksheet1.write(1, 57, "Not Sure")
-        worksheet1.write(2, 57, "Defense")
-        worksheet1.write(0, 58, len(cur_team.loc[cur_team["defense"] == "Yes"]))
-        worksheet1.write(1, 58, len(cur_team.loc[cur_team["defense"] == "No"]))
-        worksheet1.write(2, 58, len(cur_team.loc[cur_team["defense"] == "Not sure"]))
+    # this is where xlsxwriter actually puts the file together
+    with profile_stage("save_workbook"):
+        workbook.close()
 
-        chart = workbook1.add_chart({"type": "pie"})
-        chart.add_series(
-            {
-                "categories": [str(team), 0, 57, 2, 57],
-                "values": [str(team), 0, 58, 2, 58],
-            }
-        )
 
-        chart.set_title({"name": "Defense Distribution"})
+def write_team_workbook(output_path, teams, views, tab_colors, constant_memory=False):
+    workbook, formats = create_workbook(output_path, constant_memory)
 
-        worksheet1.insert_chart(len(team_data_df) + 3 + 16 + 16, 5, chart)
+    for team, tab_color in zip(teams, tab_colors):
+        print(f"Processing team {team}...")
+        write_team_sheet(workbook, formats, team, views[team], tab_color)
+
+    workbook.close()
+
+
+def get_view_hash(team, view, tab_color, rank_formulas):
+    # everything write_team_sheet puts on a team's sheet, so the same hash means the
+    # same sheet. the ranks are formulas into the rankings sheet, so only the formulas
+    # count, not the ranks themselves
+    columns = list(TEAM_DATA_COLUMNS) + list(TEAM_WRITTEN_COLUMNS)
+    content = [
+        SHEET_VERSION,
+        team,
+        tab_color,
+        view["rows"][columns].to_numpy().tolist(),
+        view["averages"].tolist(),
+        [rank_formulas[column] for column in TEAM_RANKED_COLUMNS],
+        view["stats"][list(TEAM_STATS_COLUMNS)].to_numpy().tolist(),
+        view["pit"],
+        view["auto_balance"],
+        view["tele_balance"],
+        view["defense"],
+        view["day_means"],
+        view["days"],
+    ]
+    return hashlib.sha256(repr(content).encode()).hexdigest()
 
-        # chart 6: day 1 vs. day 2
-        worksheet1.write(0, 59, "Day 1")
-        worksheet1.write(1, 59, "Day 2")
-        worksheet1.write(
-            0,
-            60,
-            field_df.loc[
-                (field_df["timestamp"] == 1) & (field_df["team_number"] == team)
-            ]["total_points"].mean(),
-        )
-        average_day2 = 0
-        if (
-            len(
-                field_df.loc[
-                    (field_df["timestamp"] == 2) & (field_df["team_number"] == team)
-                ]
+
+def write_update_workbook(output_path, teams, views, tab_colors, rankings, all_teams):
+    # constant_memory writes strings into the sheets themselves instead of one shared
+    # string table, so a sheet's xml means the same thing in any workbook
+    workbook, formats = create_workbook(output_path, True, fixed_styles=True)
+    write_rankings_sheet(workbook, formats, rankings, all_teams)
+    rank_formulas = get_rank_formulas(rankings)
+
+    for team, tab_color in zip(teams, tab_colors):
+        print(f"Processing team {team}...")
+        with profile_stage("team_sheet", team):
+            write_team_sheet(
+                workbook, formats, team, views[team], tab_color, rank_formulas
             )
-            != 0
+
+    with profile_stage("save_workbook"):
+        workbook.close()
+
+
+def get_sheet_parts(archive, sheet_names):
+    # sheet name -> the sheet's xml, its drawing and its charts, in the order
+    # xlsxwriter made them. only looks at the sheets it's asked about
+    names = set(archive.namelist())
+
+    def get_targets(part):
+        folder, name = posixpath.split(part)
+        rels_path = posixpath.join(folder, "_rels", name + ".rels")
+        if rels_path not in names:
+            return []
+        rels = ElementTree.fromstring(archive.read(rels_path))
+        return [
+            (
+                rel.get("Id"),
+                posixpath.normpath(posixpath.join(folder, rel.get("Target"))),
+            )
+            for rel in rels
+        ]
+
+    sheet_paths = dict(get_targets("xl/workbook.xml"))
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    parts = {}
+    for sheet in workbook.iter(XLSX_MAIN_NS + "sheet"):
+        if sheet.get("name") not in sheet_names:
+            continue
+        sheet_path = sheet_paths[sheet.get(XLSX_RELS_NS + "id")]
+        drawings = [path for _, path in get_targets(sheet_path) if "/drawings/" in path]
+        charts = [path for drawing in drawings for _, path in get_targets(drawing)]
+        parts[sheet.get("name")] = [sheet_path] + drawings + charts
+
+    return parts
+
+
+def patch_workbook(output_path, patch_path, sheet_names):
+    # swaps these sheets (and their drawings and charts) in output_path for the ones
+    # in patch_path. gives back False if they don't line up (without touching anything)
+    # or if the patched file doesn't read back right (then it needs rewriting)
+    with zipfile.ZipFile(output_path) as old, zipfile.ZipFile(patch_path) as patch:
+        if old.read("xl/styles.xml") != patch.read("xl/styles.xml"):
+            return False
+
+        old_parts = get_sheet_parts(old, sheet_names)
+        new_parts = get_sheet_parts(patch, sheet_names)
+        replacements = {}
+        for name in sheet_names:
+            old_paths = old_parts.get(name, [])
+            new_paths = new_parts[name]
+            # the old rels keep pointing at the old part names, so there has to be
+            # exactly one new part for every old one
+            if [posixpath.dirname(path) for path in old_paths] != [
+                posixpath.dirname(path) for path in new_paths
+            ]:
+                return False
+            for old_path, new_path in zip(old_paths, new_paths):
+                replacements[old_path] = patch.read(new_path)
+
+    # append mode writes over the old central directory at the end of the file, so
+    # only the replaced parts get compressed and written. the old copies of them stay
+    # in the file, but nothing points to them anymore
+    with zipfile.ZipFile(output_path, "a", zipfile.ZIP_DEFLATED) as archive:
+        # zipfile has no public way to drop an entry, so make sure its insides still
+        # look like they did when this got written before changing anything
+        if not isinstance(getattr(archive, "filelist", None), list) or not isinstance(
+            getattr(archive, "NameToInfo", None), dict
         ):
-            average_day2 = field_df.loc[
-                (field_df["timestamp"] == 2) & (field_df["team_number"] == team)
-            ]["total_points"].mean()
-        worksheet1.write(1, 60, average_day2)
+            return False
+        for path, data in replacements.items():
+            info = archive.getinfo(path)
+            archive.filelist.remove(info)
+            del archive.NameToInfo[path]
+            archive.writestr(
+                zipfile.ZipInfo(path, info.date_time), data, zipfile.ZIP_DEFLATED
+            )
 
-        chart = workbook1.add_chart({"type": "column"})
+    # and that every part is in there once, with the new contents
+    with zipfile.ZipFile(output_path) as archive:
+        names = archive.namelist()
+        if len(names) != len(set(names)) or any(
+            archive.read(path) != data for path, data in replacements.items()
+        ):
+            return False
 
-        chart.add_series(
-            {
-                "categories": [str(team), 0, 59, 1, 59],
-                "values": [str(team), 0, 60, 1, 60],
-                "name": [str(team), 7, 49],
-            }
-        )
+    return True
 
-        chart.set_title({"name": "Day 1 vs. Day 2"})
-        worksheet1.insert_chart(len(team_data_df) + 3 + 16 + 16, 5 + 6, chart)
 
-        # pit scouting information
-        if (
-            isinstance(pit_df, pd.DataFrame)
-            and len(pit_df.loc[pit_df["Team Number"] == team]) != 0
-        ):
+def load_manifest(manifest_path, output_path):
+    # only trusts the manifest if output.xlsx is still exactly what the last --update
+    # left behind, and hasn't piled up too many dead copies of old sheets
+    if not os.path.exists(manifest_path) or not os.path.exists(output_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    stat = os.stat(output_path)
+    if (
+        manifest.get("size") != stat.st_size
+        or manifest.get("mtime_ns") != stat.st_mtime_ns
+        or stat.st_size > 2 * manifest["full_size"]
+    ):
+        return None
+
+    return manifest
+
+
+def update_spreadsheet(
+    teams, field_df, stats_df, rankings, pit_df, output_path="output.xlsx"
+):
+    # same workbook as create_spreadsheet, but only the team sheets that changed since
+    # the last run get rewritten (plus the rankings, since those change with any team)
+    colors = [
+        color.hex for color in Color("orange").range_to(Color("grey"), len(teams))
+    ]
+    manifest_path = os.path.splitext(output_path)[0] + "_manifest.json"
+
+    with profile_stage("get_team_views"):
+        views = get_team_views(teams, field_df, stats_df, rankings, pit_df)
+        rank_formulas = get_rank_formulas(rankings)
+        hashes = {}
+        for team, color in zip(teams, colors):
+            if callable(views[team]["rows"]):
+                views[team]["rows"] = views[team]["rows"]()
+            hashes[str(team)] = get_view_hash(team, views[team], color, rank_formulas)
+
+    manifest = load_manifest(manifest_path, output_path)
+    # so a run that dies halfway through starts from scratch next time
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    changed = list(zip(teams, colors))
+    if manifest is not None and manifest["teams"] == list(hashes):
+        changed = [
+            (team, color)
+            for team, color in changed
+            if manifest["hashes"][str(team)] != hashes[str(team)]
+        ]
+        print(f"{len(changed)} of {len(teams)} team sheets changed")
 
-            cell_format = writer.book.add_format(
-                {"border": 1, "bold": True, "bg_color": "#FFD580", "valign": "center"}
+    patched = False
+    if not can_patch_workbooks():
+        print(
+            f"--update can't patch with xlsxwriter {xlsxwriter.__version__},"
+            " rewriting the whole workbook"
+        )
+    # past about half the teams, starting over is faster (and leaves no dead space)
+    elif len(changed) * 2 <= len(teams):
+        patch_path = os.path.splitext(output_path)[0] + "_patch.xlsx"
+        with profile_stage("team_sheets"):
+            write_update_workbook(
+                patch_path,
+                [team for team, _ in changed],
+                views,
+                [color for _, color in changed],
+                rankings,
+                teams,
             )
+        with profile_stage("patch_workbook"):
+            patched = patch_workbook(
+                output_path,
+                patch_path,
+                ["rankings"] + [str(team) for team, _ in changed],
+            )
+        os.remove(patch_path)
+
+    if patched:
+        full_size = manifest["full_size"]
+    else:
+        with profile_stage("team_sheets"):
+            write_update_workbook(output_path, teams, views, colors, rankings, teams)
+        full_size = os.path.getsize(output_path)
 
-            writer.sheets[str(team)].merge_range(
-                len(team_data_df) + 9 + 5,
-                0,
-                len(team_data_df) + 9 + 5,
-                2,
-                "Pit Scouting Info",
-                cell_format,
+    stat = os.stat(output_path)
+    with open(manifest_path, "w") as f:
+        json.dump(
+            {
+                "teams": list(hashes),
+                "hashes": hashes,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "full_size": full_size,
+            },
+            f,
+        )
+
+
+def create_sharded_spreadsheets(
+    teams,
+    field_df,
+    stats_df,
+    rankings,
+    pit_df,
+    output_dir,
+    teams_per_file,
+    processes,
+    constant_memory=False,
+):
+    # one small workbook per group of teams, written in parallel, plus rankings.xlsx
+    colors = [
+        color.hex for color in Color("orange").range_to(Color("grey"), len(teams))
+    ]
+    views = get_team_views(teams, field_df, stats_df, rankings, pit_df)
+
+    # so files from a run with different groups don't stick around
+    os.makedirs(output_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(output_dir, "team*.xlsx")):
+        os.remove(path)
+
+    with ProcessPoolExecutor(processes) as executor:
+        futures = []
+        for start in range(0, len(teams), teams_per_file):
+            group = teams[start : start + teams_per_file]
+            if len(group) == 1:
+                file_name = f"team_{group[0]}.xlsx"
+            else:
+                file_name = f"teams_{group[0]}-{group[-1]}.xlsx"
+
+            futures.append(
+                executor.submit(
+                    write_team_workbook,
+                    os.path.join(output_dir, file_name),
+                    group,
+                    {team: views[team] for team in group},
+                    colors[start : start + teams_per_file],
+                    constant_memory,
+                )
             )
 
-            cell_format = writer.book.add_format({"border": 1, "bold": True})
+        # the rankings only take a second, so do them while the teams are going
+        workbook, formats = create_workbook(
+            os.path.join(output_dir, "rankings.xlsx"), constant_memory
+        )
+        write_rankings_sheet(workbook, formats, rankings, teams)
+        workbook.close()
 
-            pit_team_df = pit_df.loc[pit_df["Team Number"] == team]
-            row = len(team_data_df) + 9 + 6
-            for column in pit_team_df.columns:
-                if "useless" in column:
-                    continue
+        for future in futures:
+            future.result()
 
-                worksheet1.write(row, 0, column, cell_format)
-                worksheet1.write(row, 1, pit_team_df[column].values[0])
 
-                row += 1
+def get_match_table(teams, field_df):
+    # every team's match table from the team sheets, stacked into one table
+    if isinstance(field_df, str):
+        return get_db_match_table(field_df, teams)
 
-            writer.sheets[str(team)].set_column(0, 0, width=17)
+    columns = (
+        ["team_number"] + list(TEAM_DATA_COLUMNS) + ["name", "comments", "how_break"]
+    )
+    matches = field_df.loc[field_df["team_number"].isin(teams), columns]
+    # same dtypes as the sql backend's table, whatever the field data keeps them as
+    matches = matches.astype({**SCORE_DTYPES, "comments": object})
+    return matches.sort_values("team_number", kind="stable", ignore_index=True)
+
+
+def html_table(df):
+    # a lot faster than calling to_html for every team
+    def cell(value):
+        if isinstance(value, float) and np.isnan(value):
+            return "<td></td>"
+        return f"<td>{html.escape(str(value))}</td>"
+
+    header = "".join(f"<th>{html.escape(str(column))}</th>" for column in df.columns)
+    rows = [
+        "<tr>" + "".join(cell(value) for value in values) + "</tr>"
+        for values in df.to_numpy().tolist()
+    ]
+    return f"<table>\n<tr>{header}</tr>\n" + "\n".join(rows) + "\n</table>"
+
+
+def html_document(title, sections):
+    # the html exports and the dashboard pages all look the same
+    body = "\n".join(sections)
+    return (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{html.escape(title)}</title>\n"
+        "<style>body { font-family: sans-serif; } table { border-collapse: collapse; }"
+        " td, th { border: 1px solid #ccc; padding: 2px 6px; }</style>\n"
+        f"</head>\n<body>\n{body}\n</body>\n</html>\n"
+    )
 
-        # colors!
-        writer.sheets[str(team)].set_tab_color(colors[color_idx].hex)
-        color_idx += 1
 
-        cell_format = writer.book.add_format(
-            {"border": 1, "bold": True, "bg_color": "#FFD580", "valign": "center"}
+def export_html(output_path, teams, matches, stats_df, rankings):
+    sections = [
+        "<h1>Rankings</h1>",
+        html_table(rankings),
+        "<h1>Team Stats</h1>",
+        html_table(stats_df),
+        "<h1>Teams</h1>",
+        " ".join(f'<a href="#team{team}">{team}</a>' for team in teams),
+    ]
+    for team, team_matches in matches.groupby("team_number"):
+        sections.append(f'<h2 id="team{team}">{team}</h2>')
+        sections.append(html_table(team_matches))
+
+    with open(output_path, "w") as f:
+        f.write(html_document("1787 Scouting", sections))
+
+
+def export_tables(output_format, output_dir, teams, field_df, stats_df, rankings):
+    # rankings, stats and match tables without going through xlsxwriter at all
+    os.makedirs(output_dir, exist_ok=True)
+    matches = get_match_table(teams, field_df)
+    tables = {"rankings": rankings, "stats": stats_df, "matches": matches}
+
+    if output_format == "html":
+        export_html(
+            os.path.join(output_dir, "report.html"), teams, matches, stats_df, rankings
         )
+        return
 
-        for i in range(0, len(formatted_data_columns)):
-            worksheet1.write(0, i + 1, formatted_data_columns[i], cell_format)
+    for name, table in tables.items():
+        save_table(output_format, output_dir, name, table)
 
-        worksheet1.write(0, 0, "Matches:", cell_format)
-        worksheet1.write(0, len(formatted_data_columns) + 1, "", cell_format)
-        worksheet1.write(0, len(formatted_data_columns) + 2, "Name", cell_format)
-        worksheet1.write(0, len(formatted_data_columns) + 3, "Comments", cell_format)
-        worksheet1.write(0, len(formatted_data_columns) + 4, "How break?", cell_format)
 
-        worksheet1.write(len(team_data_df) + 3 + 7, 0, "LSRL Slope", cell_format)
-        worksheet1.write(len(team_data_df) + 3 + 7, 1, "Defense %", cell_format)
-        worksheet1.write(len(team_data_df) + 3 + 7, 2, "P-value", cell_format)
+def save_table(output_format, output_dir, name, table):
+    if output_format == "csv":
+        table.to_csv(os.path.join(output_dir, f"{name}.csv"), index=False)
+    elif output_format == "json":
+        table.to_json(
+            os.path.join(output_dir, f"{name}.jsonl"), orient="records", lines=True
+        )
+    elif output_format == "parquet":
+        # needs pyarrow (or fastparquet) installed
+        table.to_parquet(os.path.join(output_dir, f"{name}.parquet"), index=False)
+
+
+def write_event_rankings(args, event_rankings):
+    # season runs also get every event's own rankings, next to the season ones
+    os.makedirs(args.output_dir, exist_ok=True)
+    for event, rankings in event_rankings.items():
+        name = f"rankings_{event}"
+        for output_format in args.output_format:
+            if output_format == "xlsx":
+                workbook, formats = create_workbook(
+                    os.path.join(args.output_dir, f"{name}.xlsx"),
+                    args.constant_memory,
+                )
+                write_rankings_sheet(workbook, formats, rankings, rankings["Team1"])
+                workbook.close()
+            elif output_format == "html":
+                export_html_table(
+                    os.path.join(args.output_dir, f"{name}.html"),
+                    f"{event} Rankings",
+                    rankings,
+                )
+            else:
+                save_table(output_format, args.output_dir, name, rankings)
+
+
+def export_html_table(output_path, title, table):
+    with open(output_path, "w") as f:
+        f.write(
+            html_document(title, [f"<h1>{html.escape(title)}</h1>", html_table(table)])
+        )
+
+
+def write_table(args, name, title, table, format_sheet=None):
+    # a plain table in every --output_format. format_sheet(worksheet, formats) can
+    # add anything else to the xlsx version once the cells are written
+    os.makedirs(args.output_dir, exist_ok=True)
+    for output_format in args.output_format:
+        if output_format == "xlsx":
+            workbook, formats = create_workbook(
+                os.path.join(args.output_dir, f"{name}.xlsx"), args.constant_memory
+            )
+            worksheet = workbook.add_worksheet(name.replace("_", " "))
+            cells = {}
+            add_cells(cells, 0, 0, [title], formats["bold"])
+            add_cells(cells, 1, 0, table.columns.tolist(), formats["header"])
+            for i, values in enumerate(table.to_numpy().tolist()):
+                add_cells(cells, i + 2, 0, values)
+            worksheet.set_column(0, len(table.columns) - 1, 16)
+            write_cells(worksheet, cells)
+            if format_sheet is not None:
+                format_sheet(worksheet, formats)
+            workbook.close()
+        elif output_format == "html":
+            export_html_table(
+                os.path.join(args.output_dir, f"{name}.html"), title, table
+            )
+        else:
+            save_table(output_format, args.output_dir, name, table)
+
+
+def write_pick_list(args, picks, target_alliance):
+    def highlight_our_team(worksheet, formats):
+        worksheet.conditional_format(
+            2,
+            0,
+            len(picks) + 1,
+            1,
+            {
+                "type": "cell",
+                "criteria": "==",
+                "value": args.our_team,
+                "format": formats["1787"],
+            },
+        )
 
-    writer.save()
+    title = "Pick List vs. " + ", ".join(map(str, target_alliance))
+    write_table(args, "pick_list", title, picks, highlight_our_team)
+
+
+def write_output(args, teams, field_df, stats_df, rankings, pit_df):
+    for output_format in args.output_format:
+        if output_format != "xlsx":
+            export_tables(
+                output_format, args.output_dir, teams, field_df, stats_df, rankings
+            )
+        else:
+            write_workbooks(args, teams, field_df, stats_df, rankings, pit_df)
+
+
+def write_workbooks(args, teams, field_df, stats_df, rankings, pit_df):
+    if args.teams_per_file > 0:
+        create_sharded_spreadsheets(
+            teams,
+            field_df,
+            stats_df,
+            rankings,
+            pit_df,
+            args.output_dir,
+            args.teams_per_file,
+            args.processes,
+            args.constant_memory,
+        )
+    elif args.update:
+        update_spreadsheet(teams, field_df, stats_df, rankings, pit_df)
+    else:
+        create_spreadsheet(
+            teams, field_df, stats_df, rankings, pit_df, args.constant_memory
+        )
 
 
 def get_pit_info(pit_csv, teams):
@@ -748,30 +3065,653 @@ def get_pit_info(pit_csv, teams):
         "Scoring Method",
         "Other Information",
     ]
-    df = pd.read_csv(pit_csv)
-    df.columns = columns
-    df["Intake Method"] = df["Intake Method"].apply(lambda x: ",".join(x.split(" ")))
-    df["Scoring Capabilities"] = df["Scoring Capabilities"].apply(
-        lambda x: ",".join(x.split(" "))
-    )
-    # df["timestamp"] = df["timestamp"].apply(lambda x: x.split(" ")[0])
-    # df["Scoring Capabilities"] = np.fromstring(df["Scoring Capabilities"])
+    # the picture links never get used, so they don't even get read
+    usecols = [i for i, column in enumerate(columns) if "useless" not in column]
+
+    # a season has one pit csv per event, they just get stacked
+    dfs = []
+    for path in get_csv_paths(pit_csv):
+        df = pd.read_csv(path, usecols=usecols)
+        df.columns = [columns[i] for i in usecols]
+        if teams is not None:
+            df = df.loc[df["Team Number"].isin(teams)]
+        dfs.append(df)
+    df = pd.concat(dfs, ignore_index=True)
+
+    for column in ["Intake Method", "Scoring Capabilities"]:
+        df[column] = df[column].str.replace(" ", ",", regex=False)
+
+    # newest entry wins if a team got pit scouted twice, but anything left blank the
+    # second time keeps the old answer (the rows are already in the order they came in)
+    df = df.groupby("Team Number", sort=False).last()
+    df.insert(1, "Team Number", df.index)
+    df.index.name = None
+
     return df
 
 
+def get_complete_rows(data):
+    # cuts the bytes off at the last full row, since the csv might still be downloading
+    end = len(data)
+    while end > 0:
+        end = data.rfind(b"\n", 0, end)
+        # odd number of quotes means the newline is inside a multi-line comment
+        if end == -1 or data.count(b'"', 0, end) % 2 == 0:
+            break
+
+    return data[: end + 1]
+
+
+def load_watch_state(field_path):
+    if is_field_db(field_path):
+        df, last_id = read_field_db(field_path)
+        state = {"last_id": last_id}
+    else:
+        with open(field_path, "rb") as f:
+            data = get_complete_rows(f.read())
+        df = read_field_csv(io.BytesIO(data))
+        state = {"offset": len(data), "prefix": hashlib.sha256(data).hexdigest()}
+
+    days = get_event_days(get_dates(df))
+    df = create_categories(df, days)
+    state.update({"days": days, "df": df, "sums": get_team_sums(df)})
+
+    return state
+
+
+def update_watch_state(field_path, state):
+    # returns the teams that got new rows, or None if everything got reloaded
+    if is_field_db(field_path):
+        new_df, last_id = read_field_db(field_path, state["last_id"])
+        if len(new_df) == 0:
+            return []
+        progress = {"last_id": last_id}
+    else:
+        with open(field_path, "rb") as f:
+            contents = f.read()
+        # everything that was already read gets hashed again, so a scout fixing an
+        # old row (even without changing its length) still gets noticed
+        prefix = hashlib.sha256(contents[: state["offset"]])
+        data = get_complete_rows(contents[state["offset"] :])
+
+        # the csv got replaced with something that isn't just the old one plus rows
+        if prefix.hexdigest() != state["prefix"]:
+            state.update(load_watch_state(field_path))
+            return None
+
+        if len(data) == 0:
+            return []
+
+        new_df = read_field_csv(io.BytesIO(data), header=None)
+        prefix.update(data)
+        progress = {
+            "offset": state["offset"] + len(data),
+            "prefix": prefix.hexdigest(),
+        }
+
+    days = get_event_days(get_dates(new_df))
+    new_days = days[~np.isin(days, state["days"])]
+
+    # a day before the last one changes the day numbers of the old rows, so just
+    # start over (a new day after the last one just gets the next number)
+    if len(new_days) != 0 and new_days.min() < state["days"][-1]:
+        state.update(load_watch_state(field_path))
+        return None
+
+    state["days"] = np.union1d(state["days"], new_days)
+    new_df = create_categories(new_df, state["days"])
+    new_df.index += len(state["df"])
+
+    new_sums = get_team_sums(new_df, start_counts=state["sums"]["count"])
+    state["sums"] = state["sums"].add(new_sums, fill_value=0).sort_index()
+    state["df"] = apply_field_schema(pd.concat([state["df"], new_df]))
+    state.update(progress)
+
+    return new_df["team_number"].unique().tolist()
+
+
+def watch(args):
+    field_paths = get_csv_paths(args.field_path)
+    if len(field_paths) != 1:
+        raise SystemExit("--watch only works with one field csv")
+    args.field_path = field_paths[0]
+    # every tick after the first only rewrites the sheets of teams that got new rows
+    # (see update_spreadsheet), instead of the whole workbook
+    if args.teams_per_file == 0:
+        args.update = True
+
+    pit_df = None
+    if args.pit_path != "":
+        pit_df = get_pit_info(args.pit_path, None)
+
+    state = None
+    # the last ratings solve, so each new one starts from there
+    rating_solutions = {}
+    last_seen = None
+    while True:
+        version = get_field_version(args.field_path)
+        if version != last_seen:
+            last_seen = version
+
+            if state is None or len(state["df"]) == 0:
+                # a new ingest db (or a csv that's just the header) has nothing to
+                # rank yet, so it gets loaded again until the first rows show up
+                state = load_watch_state(args.field_path)
+                changed_teams = None
+            else:
+                changed_teams = update_watch_state(args.field_path, state)
+
+            if len(state["df"]) == 0:
+                print("Waiting for the first rows")
+            elif changed_teams is None:
+                print(f"Loaded {len(state['df'])} rows")
+            elif len(changed_teams) != 0:
+                print(f"Got new rows for teams {sorted(changed_teams)}")
+
+            if len(state["df"]) != 0 and changed_teams != []:
+                sums = state["sums"]
+                averages = sums["total_points"] / sums["count"]
+                teams = averages.index[averages >= args.min_points].tolist()
+                rankings_df, stats_df = get_rankings(
+                    state["df"],
+                    teams,
+                    sums,
+                    rating_solutions,
+                    args.bootstrap,
+                    args.rank_by_lower_bound,
+                )
+                write_output(args, teams, state["df"], stats_df, rankings_df, pit_df)
+
+        time.sleep(args.watch_interval)
+
+
+def json_value(value):
+    # numpy scalars and nan turned into things json.dumps can write
+    if isinstance(value, dict):
+        return {str(key): json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_value(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def json_page(data):
+    return "application/json", json.dumps(json_value(data)).encode()
+
+
+def html_page(title, sections):
+    return "text/html; charset=utf-8", html_document(title, sections).encode()
+
+
+def get_dashboard_pages(teams, rankings, stats_df):
+    # the pages that depend on every team, so they get rebuilt on any new row
+    links = " ".join(f'<a href="/team/{team}">{team}</a>' for team in teams)
+    rankings_page = html_page(
+        "1787 Scouting",
+        ["<h1>Rankings</h1>", html_table(rankings), "<h1>Teams</h1>", links],
+    )
+    return {
+        "/": rankings_page,
+        "/rankings": rankings_page,
+        "/rankings.json": json_page(rankings.to_dict("records")),
+        "/stats": html_page(
+            "Team Stats", ["<h1>Team Stats</h1>", html_table(stats_df)]
+        ),
+        "/stats.json": json_page(stats_df.to_dict("records")),
+        "/teams.json": json_page(teams),
+    }
+
+
+BALANCE_LABELS = ["Docked (Engaged)", "Docked (Not Engaged)", "None"]
+
+
+def get_team_pages(team, view):
+    # ratings are fit over every team at once and the bootstrap intervals share one
+    # random stream, so those stay on the rankings/stats pages. everything here only
+    # changes when this team gets new rows
+    stats = view["stats"].drop(columns=list(RATING_METRICS.values()), errors="ignore")
+    stats = stats.loc[:, ~stats.columns.str.endswith(("_low", "_high"))]
+    matches = view["rows"][list(TEAM_DATA_COLUMNS) + ["name", "comments", "how_break"]]
+    matches = matches.astype(SCORE_DTYPES)
+    charts = {
+        "total_points": matches["total_points"].tolist(),
+        "num_cycles": matches["num_cycles"].tolist(),
+        "auto_balance": dict(zip(BALANCE_LABELS, view["auto_balance"])),
+        "tele_balance": dict(zip(BALANCE_LABELS, view["tele_balance"])),
+        "defense": dict(zip(["Yes", "No", "Not sure"], view["defense"])),
+        "day_means": view["day_means"],
+    }
+    averages = view["averages"].to_frame().T
+    chart_sections = []
+    for name in ["auto_balance", "tele_balance", "defense", "day_means"]:
+        chart_sections.append(f"<h2>{name}</h2>")
+        chart_sections.append(html_table(pd.DataFrame([charts[name]])))
+
+    return {
+        f"/team/{team}": html_page(
+            f"Team {team}",
+            [
+                f'<h1>Team {team}</h1>\n<a href="/">Rankings</a>',
+                html_table(stats),
+                "<h2>Averages</h2>",
+                html_table(averages),
+                "<h2>Matches</h2>",
+                html_table(matches),
+            ]
+            + chart_sections,
+        ),
+        f"/team/{team}.json": json_page(
+            {
+                "team": team,
+                "stats": stats.to_dict("records")[0],
+                "averages": view["averages"].to_dict(),
+                "matches": matches.to_dict("records"),
+                "charts": charts,
+                "pit": view["pit"],
+            }
+        ),
+    }
+
+
+def render_dashboard(args, state, rating_solutions, pit_df, changed_teams=None):
+    # runs off the event loop. only the teams in changed_teams (all of them if None)
+    # get their pages rebuilt
+    if len(state["df"]) == 0:
+        return {"/": html_page("1787 Scouting", ["<p>No field data yet</p>"])}
+
+    sums = state["sums"]
+    averages = sums["total_points"] / sums["count"]
+    teams = averages.index[averages >= args.min_points].tolist()
+    rankings_df, stats_df = get_rankings(
+        state["df"],
+        teams,
+        sums,
+        rating_solutions,
+        args.bootstrap,
+        args.rank_by_lower_bound,
+    )
+
+    pages = get_dashboard_pages(teams, rankings_df, stats_df)
+    if changed_teams is None:
+        changed_teams = teams
+    changed_teams = [team for team in changed_teams if team in set(teams)]
+    views = get_team_views(changed_teams, state["df"], stats_df, rankings_df, pit_df)
+    for team in changed_teams:
+        pages.update(get_team_pages(team, views[team]))
+
+    return pages
+
+
+def refresh_dashboard(args, state, rating_solutions, pit_df):
+    # returns (changed teams, new pages), with None for the teams if everything
+    # got reloaded and the old pages should all go
+    num_days = len(state["days"])
+    if len(state["df"]) == 0:
+        # nothing to update yet (see watch), so it all gets loaded again
+        state.update(load_watch_state(args.field_path))
+        changed_teams = None
+    else:
+        changed_teams = update_watch_state(args.field_path, state)
+    if changed_teams == []:
+        return [], {}
+    # a new day can turn on everyone's p-value, so every team page gets redone
+    render_teams = changed_teams if len(state["days"]) == num_days else None
+    pages = render_dashboard(args, state, rating_solutions, pit_df, render_teams)
+    return changed_teams, pages
+
+
+HTTP_ERRORS = (ConnectionError, UnicodeDecodeError, asyncio.IncompleteReadError)
+
+
+async def read_http_request(reader, max_body=1_000_000):
+    # just enough http for browsers, curl and the scouting tablets, one request per
+    # connection. returns (method, path, body), or Nones if it isn't a request
+    request_line = await reader.readline()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    parts = request_line.decode("latin-1").split()
+    length = headers.get("content-length", "0")
+    if len(parts) != 3 or not length.isdigit() or int(length) > max_body:
+        return None, None, b""
+
+    body = await reader.readexactly(int(length)) if length != "0" else b""
+    path = parts[1].split("?")[0].rstrip("/") or "/"
+    return parts[0], path, body
+
+
+async def write_http_response(writer, status, content_type, body, head=False):
+    writer.write(
+        f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\nCache-Control: no-cache\r\n"
+        "Connection: close\r\n\r\n".encode()
+    )
+    if not head:
+        writer.write(body)
+    await writer.drain()
+
+
+async def handle_dashboard_request(reader, writer, pages):
+    try:
+        method, path, _ = await read_http_request(reader)
+        page = None
+        if method is None:
+            status = "400 Bad Request"
+        elif method not in ("GET", "HEAD"):
+            status = "405 Method Not Allowed"
+        else:
+            page = pages.get(path)
+            status = "200 OK" if page is not None else "404 Not Found"
+
+        content_type, body = page or ("text/plain", status.encode())
+        await write_http_response(
+            writer, status, content_type, body, head=method == "HEAD"
+        )
+    except HTTP_ERRORS:
+        pass
+    finally:
+        writer.close()
+
+
+async def run_dashboard(args):
+    field_paths = get_csv_paths(args.field_path)
+    if len(field_paths) != 1:
+        raise SystemExit("--serve only works with one field csv")
+    args.field_path = field_paths[0]
+
+    pit_df = None
+    if args.pit_path != "":
+        pit_df = get_pit_info(args.pit_path, None)
+
+    last_seen = get_field_version(args.field_path)
+    state = load_watch_state(args.field_path)
+    rating_solutions = {}
+    # every response is already rendered; requests only ever look things up in here
+    pages = render_dashboard(args, state, rating_solutions, pit_df)
+    if len(state["df"]) == 0:
+        print("Waiting for the first rows")
+    else:
+        print(f"Loaded {len(state['df'])} rows")
+
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_dashboard_request(reader, writer, pages),
+        args.host,
+        args.port,
+    )
+    print(f"Serving the dashboard on http://{args.host}:{args.port}/")
+
+    loop = asyncio.get_running_loop()
+    async with server:
+        while True:
+            await asyncio.sleep(args.watch_interval)
+            version = get_field_version(args.field_path)
+            if version == last_seen:
+                continue
+            last_seen = version
+
+            # the pandas work happens in a thread so requests keep getting answered,
+            # and the pages only get swapped in here on the event loop
+            changed_teams, new_pages = await loop.run_in_executor(
+                None, refresh_dashboard, args, state, rating_solutions, pit_df
+            )
+            if len(state["df"]) == 0:
+                print("Waiting for the first rows")
+                pages.clear()
+            elif changed_teams is None:
+                print(f"Loaded {len(state['df'])} rows")
+                pages.clear()
+            elif len(changed_teams) != 0:
+                print(f"Got new rows for teams {sorted(changed_teams)}")
+            pages.update(new_pages)
+
+
+def serve_dashboard(args):
+    try:
+        asyncio.run(run_dashboard(args))
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_submission(body):
+    # one row, or a list of them. every row has to pass or none of them get in
+    try:
+        submission = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"not json: {e}")
+    if isinstance(submission, dict) or (
+        isinstance(submission, list)
+        and len(submission) == len(FIELD_COLUMNS)
+        and not any(isinstance(value, (dict, list)) for value in submission)
+    ):
+        submission = [submission]
+    if not isinstance(submission, list) or len(submission) == 0:
+        raise ValueError("expected a row or a list of rows")
+
+    rows = []
+    for i, row in enumerate(submission):
+        try:
+            rows.append(validate_field_row(row))
+        except ValueError as e:
+            raise ValueError(f"row {i + 1}: {e}")
+
+    return rows
+
+
+async def write_submissions(conn, queue, batch_seconds=0.05):
+    # the only thing that writes to the db. after the first submission of a burst it
+    # waits a moment, then commits everything that showed up in one transaction
+    loop = asyncio.get_running_loop()
+    # sqlite connections shouldn't be used from two threads at once
+    executor = ThreadPoolExecutor(1)
+    while True:
+        batch = [await queue.get()]
+        await asyncio.sleep(batch_seconds)
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+
+        rows = [row for rows, _ in batch for row in rows]
+        try:
+            ids = await loop.run_in_executor(executor, insert_field_rows, conn, rows)
+        except sqlite3.Error as e:
+            for _, done in batch:
+                done.set_exception(e)
+            continue
+
+        for rows, done in batch:
+            done.set_result(ids[: len(rows)])
+            ids = ids[len(rows) :]
+
+
+async def handle_submission(reader, writer, queue):
+    try:
+        method, path, body = await read_http_request(reader)
+        if method is None:
+            status, response = "400 Bad Request", {"error": "bad request"}
+        elif path != "/submit":
+            status, response = "404 Not Found", {"error": "POST rows to /submit"}
+        elif method != "POST":
+            status, response = "405 Method Not Allowed", {"error": "use POST"}
+        else:
+            try:
+                rows = parse_submission(body)
+            except ValueError as e:
+                status, response = "400 Bad Request", {"error": str(e)}
+            else:
+                # only answers once the rows are committed
+                done = asyncio.get_running_loop().create_future()
+                queue.put_nowait((rows, done))
+                try:
+                    ids = await done
+                    status, response = "200 OK", {"ids": ids}
+                except sqlite3.Error as e:
+                    status = "500 Internal Server Error"
+                    response = {"error": str(e)}
+
+        await write_http_response(writer, status, *json_page(response))
+    except HTTP_ERRORS:
+        pass
+    finally:
+        writer.close()
+
+
+async def run_ingest(args):
+    field_paths = get_csv_paths(args.field_path)
+    if len(field_paths) != 1 or not is_field_db(field_paths[0]):
+        raise SystemExit(
+            f"--ingest needs --field_path to be one {'/'.join(FIELD_DB_EXTENSIONS)} file"
+        )
+    args.field_path = field_paths[0]
+
+    conn = connect_field_db(args.field_path)
+    count = conn.execute("SELECT count(*) FROM field_rows").fetchone()[0]
+    print(f"{args.field_path} has {count} rows")
+
+    queue = asyncio.Queue()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_submission(reader, writer, queue),
+        args.host,
+        args.port,
+    )
+    print(f"Taking submissions on http://{args.host}:{args.port}/submit")
+    async with server:
+        await asyncio.gather(server.serve_forever(), write_submissions(conn, queue))
+
+
+def ingest(args):
+    try:
+        asyncio.run(run_ingest(args))
+    except KeyboardInterrupt:
+        pass
+
+
 def main():
     # TODO: remove teleop pie chart and add graph for cycles
     # adds flags
     args = process_args()
 
-    teams, df = get_team_dfs(args.field_path, args.min_points)
-    teams.sort()
-    rankings_df, stats_df = get_rankings(df, teams)
-    if args.pit_path != "":
-        pit_scouting_df = get_pit_info(args.pit_path, teams)
-        create_spreadsheet(teams, df, stats_df, rankings_df, pit_scouting_df)
+    if args.watch:
+        watch(args)
+        return
+    if args.serve:
+        serve_dashboard(args)
+        return
+    if args.ingest:
+        ingest(args)
+        return
+
+    if args.profile or args.profile_cprofile != "":
+        start_profile(cprofile=args.profile_cprofile != "")
+
+    if args.update and args.teams_per_file > 0:
+        raise SystemExit("--update only works on output.xlsx, not --teams_per_file")
+
+    try:
+        scout_trust = parse_scout_trust(args.scout_trust)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    event_rankings = {}
+    if args.sql:
+        field_paths = get_csv_paths(args.field_path)
+        if len(field_paths) != 1 or not is_field_db(field_paths[0]):
+            raise SystemExit("--sql needs --field_path to be one .db file")
+        if args.memory_report or args.reconcile != "none":
+            raise SystemExit("--memory_report and --reconcile don't work with --sql")
+        # everything after this takes the db path instead of the field data
+        df = field_paths[0]
+        with profile_stage("get_rankings"):
+            try:
+                teams, rankings_df, stats_df = get_db_rankings(
+                    df, args.min_points, args.bootstrap, args.rank_by_lower_bound
+                )
+            except ValueError as e:
+                raise SystemExit(str(e))
     else:
-        create_spreadsheet(teams, df, stats_df, rankings_df, None)
+        with profile_stage("get_team_dfs"):
+            teams, df = get_team_dfs(
+                args.field_path, args.min_points, args.cache_dir, args.processes
+            )
+        if len(df) == 0:
+            raise SystemExit("the field data doesn't have any rows yet")
+        with profile_stage("reconcile"):
+            df, reconcile_report = reconcile_rows(df, args.reconcile, scout_trust)
+            if args.reconcile != "none":
+                teams = get_teams(df, args.min_points)
+        teams.sort()
+        if len(reconcile_report) != 0:
+            print_reconcile_report(reconcile_report, args.reconcile)
+            write_table(
+                args,
+                "reconciliation",
+                f"Team/matches with more than one row ({args.reconcile})",
+                reconcile_report,
+            )
+        if args.memory_report:
+            print_memory_report(get_csv_paths(args.field_path), df)
+        with profile_stage("get_rankings"):
+            rankings_df, stats_df = get_rankings(
+                df,
+                teams,
+                resamples=args.bootstrap,
+                by_lower_bound=args.rank_by_lower_bound,
+            )
+            if df["event"].nunique() > 1:
+                event_rankings = get_event_rankings(
+                    df, teams, args.bootstrap, args.rank_by_lower_bound
+                )
+    if args.query is not None:
+        try:
+            result = query_teams(stats_df, args.query, args.query_sort)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        print(f"{len(result)} of {len(stats_df)} teams:")
+        print(result.to_string(index=False))
+        if PROFILE is not None:
+            finish_profile(args.profile_json, args.profile_cprofile)
+        return
+
+    pit_scouting_df = None
+    if args.pit_path != "":
+        with profile_stage("get_pit_info"):
+            pit_scouting_df = get_pit_info(args.pit_path, teams)
+    with profile_stage("write_output"):
+        write_output(args, teams, df, stats_df, rankings_df, pit_scouting_df)
+        if len(event_rankings) != 0:
+            write_event_rankings(args, event_rankings)
+
+    if args.pick_list:
+        if args.sql:
+            df = read_db_scores(df, PICK_LIST_COLUMNS)
+        if args.our_team not in df["team_number"].values:
+            raise SystemExit(f"{args.our_team} isn't in the field data")
+        if args.target_alliance is not None:
+            if args.our_team in args.target_alliance:
+                raise SystemExit(
+                    f"--target_alliance can't include --our_team {args.our_team}"
+                )
+            missing = set(args.target_alliance) - set(df["team_number"].values)
+            if len(missing) != 0:
+                raise SystemExit(
+                    f"--target_alliance {sorted(missing)} isn't in the field data"
+                )
+        with profile_stage("simulate_alliances"):
+            picks, target_alliance = simulate_alliances(
+                df, teams, args.our_team, args.target_alliance, args.simulations
+            )
+            write_pick_list(args, picks, target_alliance)
+        print(f"Best partners against {target_alliance}:")
+        print(picks.head(10).to_string(index=False))
+
+    if PROFILE is not None:
+        finish_profile(args.profile_json, args.profile_cprofile)
 
 
 if __name__ == "__main__":